@@ -13,19 +13,21 @@ from client.client_config import ORIGINAL_HANDLERS_AVAILABLE, ClientConfig
 # Import original handlers if available for direct use
 if ORIGINAL_HANDLERS_AVAILABLE:
     from src.audio_handler import speak as original_speak_func
+    from src.audio_handler import speak_flush as original_speak_flush
     from src.image_handler import (
         _capture_image_linux,
         _capture_image_rpi,
         _capture_image_termux,
     )
 else:
-    original_speak_func = None
+    original_speak_func, original_speak_flush = None, None
     _capture_image_termux, _capture_image_rpi, _capture_image_linux = None, None, None
 
 
 # Import shared message models
 # Assuming 'shared' is in project_root, and project_root is in sys.path
 from shared.message_models import (
+    SERVER_PAYLOAD_MODELS,
     ClientRegistration,
     Command,
     CommandResponse,
@@ -228,20 +230,15 @@ class NetworkLogic:
                     data_dict = json.loads(message_str)
                     ws_msg = WebSocketMessage(**data_dict)  # Validate overall structure
 
-                    # Parse payload based on type for stricter validation if needed
+                    # Parse payload via the tag -> model map for stricter
+                    # validation without walking an if/elif chain per message
                     parsed_payload = None
                     if ws_msg.payload:
-                        if ws_msg.type == "command":
-                            parsed_payload = Command(**ws_msg.payload)
-                        elif ws_msg.type == "pong":
-                            parsed_payload = PongMessage(**ws_msg.payload)
-                        elif ws_msg.type == "media_ack":
-                            parsed_payload = MediaAck(**ws_msg.payload)
-                        elif (
-                            ws_msg.type == "command_response"
-                        ):  # Response to a client-initiated command
-                            parsed_payload = CommandResponse(**ws_msg.payload)
-                        # Add other specific server-to-client types
+                        payload_model = SERVER_PAYLOAD_MODELS.get(ws_msg.type)
+                        if payload_model is not None:
+                            parsed_payload = payload_model.model_validate(
+                                ws_msg.payload
+                            )
 
                     await self._handle_server_message(
                         ws_msg.type, parsed_payload or ws_msg.payload
@@ -669,11 +666,15 @@ class NetworkLogic:
 
         logger.info(f"Executing speak_text action: '{text_to_speak}' as {agent_name}")
         try:
+            def _speak_and_wait():
+                # speak() only enqueues now; wait for playback so the command
+                # response still means the text was actually spoken
+                original_speak_func(text_to_speak, agent_name)
+                if original_speak_flush is not None:
+                    original_speak_flush(timeout=30)
+
             loop = asyncio.get_running_loop()
-            # original_speak_func might be blocking (e.g., pyttsx3.runAndWait())
-            await loop.run_in_executor(
-                None, original_speak_func, text_to_speak, agent_name
-            )
+            await loop.run_in_executor(None, _speak_and_wait)
             await self.send_command_response(
                 command_id,
                 "success",
@@ -1,5 +1,6 @@
 import logging
 import sys
+import threading
 import time
 import os # Added import
 
@@ -33,7 +34,7 @@ except ValueError as e: # Catch config errors like missing API key
 # The logic is now primarily within persona.py, just grab the result
 try:
     active_persona = persona_module.ACTIVE_PERSONA
-    agent_name = active_persona['name'] # Get agent name for convenience
+    agent_name = active_persona.name # Get agent name for convenience
     logging.info(f"Using active persona: {agent_name}")
 except AttributeError:
     logging.critical("CRITICAL: Could not load ACTIVE_PERSONA from src.persona. Exiting.")
@@ -162,11 +163,15 @@ def conversation_loop(chat_session):
 
         # Process the user input with Gemini
         try:
-            # Pass chat_session (no persona needed here)
-            reply = gemini_handler.get_chat_reply(chat_session, user_input)
+            # Pass chat_session (no persona needed here); sentences stream
+            # into the TTS queue as they arrive instead of after the full reply
+            reply = gemini_handler.get_chat_reply(
+                chat_session,
+                user_input,
+                on_sentence=lambda s: audio_handler.speak(s, agent_name),
+            )
 
             print(f"\n{agent_name}: {reply}")
-            audio_handler.speak(reply, agent_name)
         except Exception as e:
             logging.exception(f"Error getting response from Gemini during conversation: {e}")
             error_msg = "Sorry, my brain circuits seem to be tangled. Can we try that again?"
@@ -179,6 +184,10 @@ def main():
     # Use agent_name loaded globally
     logging.info(f"{agent_name} starting up on platform: {config.PLATFORM}")
 
+    # Warm the audio stack in the background so the first speak/listen
+    # doesn't pay driver and device initialization
+    threading.Thread(target=audio_handler.warmup, daemon=True).start()
+
     # Initialize Gemini chat session once with the active persona
     chat_session = None
     try:
@@ -218,6 +227,8 @@ def main():
             shutdown_msg = f"Shutting down {agent_name}. Goodbye!"
             print(shutdown_msg)
             audio_handler.speak("Goodbye!", agent_name)
+            # speak() is asynchronous now; wait for the farewell to finish
+            audio_handler.speak_flush(timeout=10)
             break
 
         else:
@@ -3,6 +3,7 @@ import logging
 import time
 from typing import Any, Dict, List, Optional, Set
 
+import orjson
 from fastapi import WebSocket
 
 from shared.message_models import WebSocketMessage  # Use shared models
@@ -25,6 +26,14 @@ class ClientInfo:
         self.platform: str = platform
         self.capabilities: Set[str] = set(capabilities)
         self.registration_time: float = time.monotonic()
+        # Capabilities and registration time never change after connect, so
+        # precompute the presentation forms the status endpoints keep asking for.
+        # Use the wall clock here; registration_time is monotonic and renders
+        # as 1970 when fed to gmtime().
+        self.sorted_capabilities: List[str] = sorted(self.capabilities)
+        self.connected_since_str: str = time.strftime(
+            "%Y-%m-%d %H:%M:%S", time.gmtime()
+        )
         self.last_seen_time: float = time.monotonic()
         self.active_streams: Dict[str, Dict[str, Any]] = (
             {}
@@ -35,10 +44,11 @@ class ClientInfo:
     async def send_json_message(self, message: WebSocketMessage):
         try:
             if self.websocket.client_state == self.websocket.client_state.CONNECTED:
-                await self.websocket.send_json(
-                    message.model_dump(exclude_none=True)
-                )  # Pydantic v2
-                # For Pydantic v1: await self.websocket.send_json(message.dict(exclude_none=True))
+                # orjson is several times faster than the stdlib json encoder
+                # send_json would route through
+                await self.websocket.send_text(
+                    orjson.dumps(message.model_dump(exclude_none=True)).decode()
+                )
                 logger.debug(f"Sent to {self.client_id} ({self.name}): {message.type}")
             else:
                 logger.warning(
@@ -70,6 +80,8 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, ClientInfo] = {}  # client_id -> ClientInfo
         self.client_id_by_websocket: Dict[WebSocket, str] = {}
+        # Reverse index so stream lookups don't scan every connection
+        self.stream_to_client: Dict[str, str] = {}  # stream_id -> client_id
 
     async def connect(
         self,
@@ -98,10 +110,22 @@ class ConnectionManager:
         )
         return client_info
 
+    def register_stream(self, stream_id: str, client_id: str):
+        """Record which client owns a stream for O(1) lookups."""
+        self.stream_to_client[stream_id] = client_id
+
+    def get_client_by_stream(self, stream_id: str) -> Optional[ClientInfo]:
+        client_id = self.stream_to_client.get(stream_id)
+        if client_id:
+            return self.active_connections.get(client_id)
+        return None
+
     def disconnect(self, client_id: str, reason: str = "Client disconnected"):
         client_info = self.active_connections.pop(client_id, None)
         if client_info:
             self.client_id_by_websocket.pop(client_info.websocket, None)
+            for stream_id in client_info.active_streams:
+                self.stream_to_client.pop(stream_id, None)
             # Cancel any pending commands for this client
             for cmd_id, future in list(client_info.pending_commands.items()):
                 if not future.done():
@@ -4,17 +4,20 @@ import json
 import logging
 import os
 import signal
+import struct
 import sys
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Optional, Union
 
 import cv2
 import numpy as np
+import orjson
 import uvicorn
 from fastapi import Body, FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, ValidationError
 
@@ -23,11 +26,11 @@ from server.server_config import config
 from server.stream_manager import stream_manager
 from server.ui.routes import router as ui_router
 from shared.message_models import (
+    CLIENT_PAYLOAD_MODELS,
     ClientRegistration,
     CommandResponse,
     MediaAck,
     PingMessage,
-    PongMessage,
     ServerAck,
     StreamStatusUpdate,
     WebSocketMessage,
@@ -59,21 +62,99 @@ app.include_router(ui_router)
 # server state
 is_shutting_down = False
 
+# Binary frame header: 4-byte ASCII prefix + 4-byte big-endian sequence number
+_HEADER = struct.Struct("!4sI")
+
+# Pong envelopes differ only in the two timestamps, so splice them into a
+# fixed template instead of building two pydantic models + json.dumps per ping.
+_PONG_TEMPLATE = '{"type":"pong","payload":{"timestamp":%.6f,"server_time":%.6f}}'
+
+# Video frames go through cv2 (imdecode, SLAM, VideoWriter, imencode) which
+# blocks for milliseconds per frame; run that on a dedicated single worker
+# thread so the event loop keeps serving other clients. One worker keeps
+# frames ordered for the recorders.
+_VIDEO_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="video")
+
+# Coarse monotonic clock for per-message heartbeat stamps. Heartbeats only
+# need ~1s resolution, so a background ticker saves a time.monotonic() call
+# per WebSocket message on the hot receive path.
+_NOW = [time.monotonic()]
+
+
+async def _tick_now():
+    """Refresh the coarse clock every 250 ms."""
+    while True:
+        _NOW[0] = time.monotonic()
+        await asyncio.sleep(0.25)
+
+
+_ticker_task = None
+
+
+@app.on_event("startup")
+async def _start_clock_ticker():
+    # Keep a reference so the ticker can't be garbage-collected mid-run.
+    global _ticker_task
+    _ticker_task = asyncio.create_task(_tick_now())
+
 # ==================== HELPER FUNCTIONS ====================
 
 
+# Scratch frames for placeholder rendering, keyed by shape. Rendering into a
+# pooled buffer instead of np.ones() keeps rebuilds (the two viz/map variants
+# share a shape, and the texts may become dynamic one day) allocation-free.
+_PLACEHOLDER_SCRATCH: Dict[tuple, np.ndarray] = {}
+
+
+def _build_placeholder_jpeg(shape, fill, text, org, color):
+    """Render a placeholder frame with a status message and JPEG-encode it."""
+    placeholder = _PLACEHOLDER_SCRATCH.get(shape)
+    if placeholder is None:
+        placeholder = _PLACEHOLDER_SCRATCH.setdefault(
+            shape, np.empty(shape, dtype=np.uint8)
+        )
+    placeholder.fill(fill)
+    cv2.putText(
+        placeholder,
+        text,
+        org,
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1,
+        color,
+        2,
+    )
+    success, buffer = cv2.imencode(".jpg", placeholder)
+    if not success:
+        raise RuntimeError(f"Failed to encode placeholder image '{text}'")
+    return buffer.tobytes()
+
+
+# Placeholder responses are identical on every request, so encode them once at
+# import instead of paying a ~1 MB numpy allocation + JPEG encode per hit.
+_PLACEHOLDER_SLAM_OFF_VIZ = _build_placeholder_jpeg(
+    (480, 640, 3), 100, "SLAM not active", (50, 240), (255, 255, 255)
+)
+_PLACEHOLDER_SLAM_WAIT_VIZ = _build_placeholder_jpeg(
+    (480, 640, 3), 100, "SLAM processing - please wait", (50, 240), (255, 255, 255)
+)
+_PLACEHOLDER_MAP_OFF = _build_placeholder_jpeg(
+    (400, 400, 3), 255, "Map not available", (50, 200), (0, 0, 0)
+)
+_PLACEHOLDER_MAP_WAIT = _build_placeholder_jpeg(
+    (400, 400, 3), 255, "Building map...", (50, 200), (0, 0, 0)
+)
+
+
 async def send_ws_message(
     websocket: WebSocket, message_type: str, payload: Optional[Dict] = None
 ):
     """Send a standardized WebSocket message"""
     try:
         ws_msg = WebSocketMessage(type=message_type, payload=payload)
-        json_data = (
-            ws_msg.model_dump(exclude_none=True)
-            if hasattr(ws_msg, "model_dump")
-            else ws_msg.dict(exclude_none=True)
+        # orjson serializes the dump several times faster than stdlib json
+        await websocket.send_text(
+            orjson.dumps(ws_msg.model_dump(exclude_none=True)).decode()
         )
-        await websocket.send_json(json_data)
     except Exception as e:
         logger.error(f"Error sending WebSocket message of type {message_type}: {e}")
         # Log but don't re-raise
@@ -124,12 +205,14 @@ async def handle_client_text_message(
 
     elif msg_type == "ping":
         if isinstance(payload, PingMessage):
-            pong_model = PongMessage(
-                timestamp=payload.timestamp, server_time=time.time()
-            )
-            await client_info.send_json_message(
-                WebSocketMessage(type="pong", payload=pong_model.model_dump())
-            )
+            try:
+                await client_info.websocket.send_text(
+                    _PONG_TEMPLATE % (payload.timestamp, time.time())
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error sending pong to {client_info.client_id}: {e}"
+                )
         else:
             logger.warning(
                 f"Invalid or missing payload for ping from {client_info.client_id}"
@@ -141,24 +224,19 @@ async def handle_client_text_message(
                 f"Client '{client_info.name}' status for stream '{payload.stream_id}': {payload.status}. Reason: {payload.reason}"
             )
 
-            if payload.stream_id not in client_info.active_streams:
-                client_info.active_streams[payload.stream_id] = {}
-
-            client_info.active_streams[payload.stream_id].update(
-                {
-                    "client_reported_status": payload.status,
-                    "width": payload.width
-                    or client_info.active_streams[payload.stream_id].get("width"),
-                    "height": payload.height
-                    or client_info.active_streams[payload.stream_id].get("height"),
-                    "fps": payload.fps
-                    or client_info.active_streams[payload.stream_id].get("fps"),
-                }
-            )
+            stream = client_info.active_streams.setdefault(payload.stream_id, {})
+            manager.register_stream(payload.stream_id, client_info.client_id)
+            stream["client_reported_status"] = payload.status
+            if payload.width is not None:
+                stream["width"] = payload.width
+            if payload.height is not None:
+                stream["height"] = payload.height
+            if payload.fps is not None:
+                stream["fps"] = payload.fps
 
             if payload.status in ["error_on_client", "stopped_by_client"]:
                 stream_manager.stop_recording(payload.stream_id)
-                client_info.active_streams[payload.stream_id]["is_recording"] = False
+                stream["is_recording"] = False
         else:
             logger.warning(
                 f"Invalid or missing payload for stream_status from {client_info.client_id}"
@@ -180,9 +258,20 @@ async def handle_client_binary_message(client_info: ClientInfo, binary_data: byt
         return
 
     try:
-        # Parse binary message format
-        prefix = binary_data[:4].decode("ascii")
-        sequence = int.from_bytes(binary_data[4:8], "big")
+        # Parse binary message format (one C call instead of slice+decode+int)
+        prefix, sequence = _HEADER.unpack_from(binary_data, 0)
+
+        # Reject unknown prefixes before doing any further parsing, slicing
+        # or ack construction for a frame we'd discard anyway.
+        if prefix == b"IMG:":
+            media_type_str = "image"
+        elif prefix == b"VID:":
+            media_type_str = "video_frame"
+        else:
+            logger.warning(
+                f"Client '{client_info.name}': Unknown binary prefix '{prefix!r}'"
+            )
+            return
 
         # Find stream_id (null-terminated string)
         stream_id_end_idx = 8
@@ -203,19 +292,14 @@ async def handle_client_binary_message(client_info: ClientInfo, binary_data: byt
         except UnicodeDecodeError:
             logger.error(f"Error decoding stream_id bytes: {stream_id_bytes!r}")
             return
-        media_payload = binary_data[stream_id_end_idx + 1 :]
+        # Zero-copy view of the media tail (often 10-100 KB per VID frame);
+        # consumers read it via np.frombuffer / file write without owning it.
+        media_payload = memoryview(binary_data)[stream_id_end_idx + 1 :]
 
         logger.debug(
             f"Client '{client_info.name}': Binary data. Prefix: {prefix}, Seq: {sequence}, StreamID: '{stream_id}', Size: {len(media_payload)} bytes"
         )
 
-        # Determine media type
-        media_type_str = "unknown"
-        if prefix == "IMG:":
-            media_type_str = "image"
-        elif prefix == "VID:":
-            media_type_str = "video_frame"
-
         # Send acknowledgment
         ack_model = MediaAck(
             media_type=media_type_str, sequence=sequence, stream_id=stream_id
@@ -225,13 +309,13 @@ async def handle_client_binary_message(client_info: ClientInfo, binary_data: byt
         )
 
         # Process media based on type
-        if prefix == "IMG:":
+        if prefix == b"IMG:":
             image_format = "jpg"  # TODO: Get actual format from command response
             stream_manager.save_image_data(
                 client_info.name, sequence, image_format, media_payload
             )
 
-        elif prefix == "VID:":
+        elif prefix == b"VID:":
             if not stream_id:
                 logger.warning(
                     f"Client '{client_info.name}': VID frame without stream_id. Seq: {sequence}. Discarding."
@@ -244,15 +328,14 @@ async def handle_client_binary_message(client_info: ClientInfo, binary_data: byt
                 )
             else:
                 client_info.active_streams[stream_id]["last_frame_seq"] = sequence
-                stream_manager.process_video_frame(
-                    stream_id, media_payload, client_info
+                await asyncio.get_running_loop().run_in_executor(
+                    _VIDEO_EXECUTOR,
+                    stream_manager.process_video_frame,
+                    stream_id,
+                    media_payload,
+                    client_info,
                 )
 
-        else:
-            logger.warning(
-                f"Client '{client_info.name}': Unknown binary prefix '{prefix}'"
-            )
-
     except Exception as e:
         logger.exception(
             f"Client '{client_info.name}': Error processing binary message: {e}"
@@ -361,7 +444,7 @@ async def websocket_endpoint(websocket: WebSocket, client_name: str):
                 data = await websocket.receive()
                 # Add null check before accessing attribute
                 if client_info:
-                    client_info.last_seen_time = time.monotonic()
+                    client_info.last_seen_time = _NOW[0]
             except RuntimeError as e:
                 if "disconnect message has been received" in str(e):
                     logger.info(
@@ -370,21 +453,19 @@ async def websocket_endpoint(websocket: WebSocket, client_name: str):
                     break
                 else:
                     raise
-            client_info.last_seen_time = time.monotonic()
 
             if "text" in data:
                 try:
                     ws_msg = WebSocketMessage(**json.loads(data["text"]))
 
-                    # Parse payload based on message type
+                    # Parse payload via the tag -> model map
                     parsed_payload = None
                     if ws_msg.payload:
-                        if ws_msg.type == "command_response":
-                            parsed_payload = CommandResponse(**ws_msg.payload)
-                        elif ws_msg.type == "ping":
-                            parsed_payload = PingMessage(**ws_msg.payload)
-                        elif ws_msg.type == "stream_status":
-                            parsed_payload = StreamStatusUpdate(**ws_msg.payload)
+                        payload_model = CLIENT_PAYLOAD_MODELS.get(ws_msg.type)
+                        if payload_model is not None:
+                            parsed_payload = payload_model.model_validate(
+                                ws_msg.payload
+                            )
 
                     await handle_client_text_message(
                         client_info, ws_msg.type, parsed_payload or ws_msg.payload
@@ -463,10 +544,8 @@ async def list_clients():
         clients_data[cid] = {
             "name": cinfo.name,
             "platform": cinfo.platform,
-            "capabilities": sorted(list(cinfo.capabilities)),
-            "connected_since": time.strftime(
-                "%Y-%m-%d %H:%M:%S", time.gmtime(cinfo.registration_time)
-            ),
+            "capabilities": cinfo.sorted_capabilities,
+            "connected_since": cinfo.connected_since_str,
             "last_seen_ago_s": f"{time.monotonic() - cinfo.last_seen_time:.1f}",
             "active_streams": list(cinfo.active_streams.keys()),
             "streams_recording": [
@@ -502,11 +581,14 @@ async def send_client_command(
 @app.post("/streams/{stream_id}/record/{action}")
 async def toggle_stream_recording(stream_id: str, action: str):
     """Start or stop recording for a stream"""
-    found_client = None
-    for client in manager.active_connections.values():
-        if stream_id in client.active_streams:
-            found_client = client
-            break
+    found_client = next(
+        (
+            c
+            for c in manager.active_connections.values()
+            if stream_id in c.active_streams
+        ),
+        None,
+    )
 
     if not found_client:
         raise HTTPException(
@@ -545,13 +627,18 @@ async def toggle_stream_recording(stream_id: str, action: str):
 
 
 @app.post("/api/streams/{stream_id}/slam/{action}")
-async def toggle_slam_processing(stream_id: str, action: str):
+async def toggle_slam_processing(
+    stream_id: str, action: str, frame_skip: Optional[int] = None
+):
     """Enable or disable SLAM processing for a stream"""
-    found_client = None
-    for client in manager.active_connections.values():
-        if stream_id in client.active_streams:
-            found_client = client
-            break
+    found_client = next(
+        (
+            c
+            for c in manager.active_connections.values()
+            if stream_id in c.active_streams
+        ),
+        None,
+    )
 
     if not found_client:
         return JSONResponse(
@@ -566,6 +653,9 @@ async def toggle_slam_processing(stream_id: str, action: str):
 
     if action.lower() == "on":
         stream_params["slam_enabled"] = True
+        if frame_skip is not None:
+            # Process one SLAM frame per frame_skip+1 received frames
+            stream_params["slam_frame_skip"] = max(0, frame_skip)
         # Initialize SLAM processor
         stream_manager.initialize_slam(stream_id, found_client.client_id)
         return {"success": True, "slam_enabled": True, "stream_id": stream_id}
@@ -584,65 +674,28 @@ async def toggle_slam_processing(stream_id: str, action: str):
 @app.get("/api/streams/{stream_id}/slam_view")
 async def get_slam_visualization(stream_id: str):
     """Get the SLAM visualization for a stream"""
-    import io
-
-    from fastapi.responses import Response
-
     # Find client with this stream
-    client_id = None
-    for cid, client in manager.active_connections.items():
-        if stream_id in client.active_streams:
-            client_id = cid
-            break
-
-    if not client_id:
+    client = next(
+        (
+            c
+            for c in manager.active_connections.values()
+            if stream_id in c.active_streams
+        ),
+        None,
+    )
+    if client is None:
         raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found")
 
-    client = manager.active_connections[client_id]
     stream_params = client.active_streams[stream_id]
 
     # Check if SLAM is enabled
     if not stream_params.get("slam_enabled", False):
-        # Return placeholder image
-        placeholder = np.ones((480, 640, 3), dtype=np.uint8) * 100
-        cv2.putText(
-            placeholder,
-            "SLAM not active",
-            (50, 240),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (255, 255, 255),
-            2,
-        )  # type: ignore[attr-defined]
-
-        success, buffer = cv2.imencode(".jpg", placeholder)
-        if not success:
-            raise HTTPException(
-                status_code=500, detail="Failed to encode placeholder image"
-            )
-
-        return Response(content=buffer.tobytes(), media_type="image/jpeg")
+        # Return pre-encoded placeholder image
+        return Response(content=_PLACEHOLDER_SLAM_OFF_VIZ, media_type="image/jpeg")
 
     # Check if we have a SLAM result
     if "latest_slam_result" not in stream_params:
-        placeholder = np.ones((480, 640, 3), dtype=np.uint8) * 100
-        cv2.putText(
-            placeholder,
-            "SLAM processing - please wait",
-            (50, 240),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (255, 255, 255),
-            2,
-        )
-
-        success, buffer = cv2.imencode(".jpg", placeholder)
-        if not success:
-            raise HTTPException(
-                status_code=500, detail="Failed to encode placeholder image"
-            )
-
-        return Response(content=buffer.tobytes(), media_type="image/jpeg")
+        return Response(content=_PLACEHOLDER_SLAM_WAIT_VIZ, media_type="image/jpeg")
 
     # Return the SLAM visualization
     slam_result = stream_params["latest_slam_result"]
@@ -655,65 +708,28 @@ async def get_slam_visualization(stream_id: str):
 @app.get("/api/streams/{stream_id}/slam_map")
 async def get_slam_map(stream_id: str):
     """Get the SLAM map for a stream"""
-    import io
-
-    from fastapi.responses import Response
-
     # Find client with this stream
-    client_id = None
-    for cid, client in manager.active_connections.items():
-        if stream_id in client.active_streams:
-            client_id = cid
-            break
-
-    if not client_id:
+    client = next(
+        (
+            c
+            for c in manager.active_connections.values()
+            if stream_id in c.active_streams
+        ),
+        None,
+    )
+    if client is None:
         raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found")
 
-    client = manager.active_connections[client_id]
     stream_params = client.active_streams[stream_id]
 
     # Check if SLAM is enabled
     if not stream_params.get("slam_enabled", False):
-        # Return placeholder image
-        placeholder = np.ones((400, 400, 3), dtype=np.uint8) * 255
-        cv2.putText(
-            placeholder,
-            "Map not available",
-            (50, 200),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (0, 0, 0),
-            2,
-        )
-
-        success, buffer = cv2.imencode(".jpg", placeholder)
-        if not success:
-            raise HTTPException(
-                status_code=500, detail="Failed to encode placeholder image"
-            )
-
-        return Response(content=buffer.tobytes(), media_type="image/jpeg")
+        # Return pre-encoded placeholder image
+        return Response(content=_PLACEHOLDER_MAP_OFF, media_type="image/jpeg")
 
     # Check if we have a SLAM result
     if "latest_slam_result" not in stream_params:
-        placeholder = np.ones((400, 400, 3), dtype=np.uint8) * 255
-        cv2.putText(
-            placeholder,
-            "Building map...",
-            (50, 200),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (0, 0, 0),
-            2,
-        )
-
-        success, buffer = cv2.imencode(".jpg", placeholder)
-        if not success:
-            raise HTTPException(
-                status_code=500, detail="Failed to encode placeholder image"
-            )
-
-        return Response(content=buffer.tobytes(), media_type="image/jpeg")
+        return Response(content=_PLACEHOLDER_MAP_WAIT, media_type="image/jpeg")
 
     # Return the SLAM map
     slam_result = stream_params["latest_slam_result"]
@@ -727,16 +743,17 @@ async def get_slam_map(stream_id: str):
 async def get_slam_data(stream_id: str):
     """Get SLAM data in JSON format"""
     # Find client with this stream
-    client_id = None
-    for cid, client in manager.active_connections.items():
-        if stream_id in client.active_streams:
-            client_id = cid
-            break
-
-    if not client_id:
+    client = next(
+        (
+            c
+            for c in manager.active_connections.values()
+            if stream_id in c.active_streams
+        ),
+        None,
+    )
+    if client is None:
         raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found")
 
-    client = manager.active_connections[client_id]
     stream_params = client.active_streams[stream_id]
 
     # Check if SLAM is enabled
@@ -768,9 +785,7 @@ async def cleanup_on_shutdown():
     is_shutting_down = True
     logger.info("Server initiating graceful shutdown...")
 
-    # Close all client connections
-    active_client_ids = list(manager.active_connections.keys())
-    for client_id in active_client_ids:
+    async def _close_one(client_id: str):
         client = manager.get_client_by_id(client_id)
         if client and client.websocket:
             try:
@@ -779,6 +794,14 @@ async def cleanup_on_shutdown():
                 pass
         manager.disconnect(client_id, "Server shutting down")
 
+    # Close all client connections concurrently; a sequential loop would pay
+    # one close handshake per client.
+    active_client_ids = list(manager.active_connections.keys())
+    await asyncio.gather(
+        *(_close_one(client_id) for client_id in active_client_ids),
+        return_exceptions=True,
+    )
+
     # Shutdown stream manager
     stream_manager.shutdown()
     logger.info("Server shutdown complete")
@@ -805,12 +828,22 @@ if __name__ == "__main__":
                 f"Could not set signal handler for {getattr(sig, 'name', sig)}: {e}"
             )
 
+    # Pin the C-backed implementations (uvloop + httptools parser + websockets
+    # protocol) instead of letting "auto" fall back to pure-Python h11/wsproto.
+    # permessage-deflate is disabled because the WS payloads are mostly JPEG
+    # frames that don't compress, and the access log costs a logger call per
+    # request on the polling endpoints.
     uvicorn_config = uvicorn.Config(
         app,
         host=config.HOST,
         port=config.PORT,
         log_level="info",
         workers=config.UVICORN_WORKERS,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_per_message_deflate=False,
+        access_log=False,
     )
 
     server = uvicorn.Server(uvicorn_config)
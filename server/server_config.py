@@ -2,6 +2,8 @@ import logging
 import os
 from dataclasses import dataclass, field
 
+import cv2
+
 
 @dataclass
 class ServerConfig:
@@ -42,3 +44,17 @@ class ServerConfig:
 
 
 config = ServerConfig()
+
+# OpenCV runtime tuning: make sure the SIMD-dispatched kernels are on and
+# leave half the cores for the asyncio/uvicorn side. Every hot call in the
+# SLAM/recording path (cvtColor, ORB, findHomography, imdecode/imencode,
+# resize, VideoWriter.write) goes through these kernels. For container base
+# images, build OpenCV with CPU_DISPATCH=AVX2,AVX512_SKX to widen the lanes.
+cv2.setUseOptimized(True)
+cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+_cv2_logger = logging.getLogger("server.config")
+for _line in cv2.getBuildInformation().splitlines():
+    # Surface the dispatch line so deployments without AVX2 are detectable
+    if "dispatched code" in _line.lower():
+        _cv2_logger.info(f"OpenCV {_line.strip()}")
+        break
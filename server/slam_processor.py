@@ -1,10 +1,20 @@
 import cv2
 import numpy as np
+import heapq
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger("server.slam_processor")
 
+# Prefer the MAGSAC USAC estimator (smarter sample checking + early
+# termination, OpenCV >= 4.5.4); fall back to RHO, then classic RANSAC.
+_HOMOGRAPHY_METHOD = getattr(cv2, "USAC_MAGSAC", getattr(cv2, "RHO", cv2.RANSAC))
+
+# Shared pool for JPEG encodes; cv2.imencode releases the GIL inside libjpeg,
+# so the per-frame visualizations encode in parallel on separate cores.
+_JPEG_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="jpeg")
+
 class SLAMProcessor:
     def __init__(self, client_id, stream_id):
         """Initialize the SLAM processor"""
@@ -15,30 +25,83 @@ class SLAMProcessor:
         self.feature_points = []  # Will store detected feature points
         self.is_initialized = False
         self.lock = threading.Lock()  # For thread safety
+        # ORB cost scales with pixel count and the trajectory only needs
+        # coarse motion, so detect on a downscaled frame and scale the
+        # recovered translation back up.
+        self.slam_scale = 0.5
         
-        # Initialize the ORB feature detector
-        self.orb = cv2.ORB_create(nfeatures=1000)
-        # Initialize the feature matcher
-        self.matcher = cv2.BFMatcher_create(cv2.NORM_HAMMING, crossCheck=True)
+        # Detection and Hamming matching are data-parallel, so run them on
+        # the GPU when a CUDA-enabled OpenCV build and device are present
+        self._use_cuda = False
+        try:
+            self._use_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except (AttributeError, cv2.error):
+            pass
+
+        # 300 features are plenty for the coarse 2D trajectory (only the best
+        # ~20 feed the homography) and matcher cost scales with the square of
+        # the retained count; fewer pyramid levels trims BRIEF time further.
+        orb_params = dict(
+            nfeatures=300, scaleFactor=1.3, nlevels=4,
+            edgeThreshold=15, fastThreshold=20,
+        )
+        if self._use_cuda:
+            self.orb = cv2.cuda_ORB.create(**orb_params)
+            self.matcher = cv2.cuda_DescriptorMatcher.createBFMatcher(cv2.NORM_HAMMING)
+            self.cuda_stream = cv2.cuda_Stream()
+            logger.info(f"SLAM processor using CUDA ORB pipeline for stream {stream_id}")
+        else:
+            # Initialize the ORB feature detector
+            self.orb = cv2.ORB_create(**orb_params)
+            # Initialize the feature matcher. FLANN with an LSH index is
+            # binary-descriptor aware and sublinear, unlike the O(N*M) brute-force
+            # Hamming search; Lowe's ratio test replaces crossCheck filtering.
+            index_params = dict(algorithm=6, table_number=6, key_size=12, multi_probe_level=1)
+            self.matcher = cv2.FlannBasedMatcher(index_params, dict(checks=32))
         
         # Store previous frame data
         self.prev_frame = None
         self.prev_kp = None
         self.prev_des = None
+        self.prev_kp_xy = None  # Nx2 float32 keypoint coordinates
+
+        # Reusable visualization buffer; a fresh frame.copy() per call is
+        # ~900 KB of writes plus allocator pressure at stream rate
+        self._viz_buf = None
+
+        # The map only changes when the trajectory grows, so cache its last
+        # encode alongside the trajectory length it was taken at
+        self._map_encode_cache = (None, -1)  # (bytes, trajectory_len_at_encode)
         
         logger.info(f"SLAM processor initialized for client {client_id}, stream {stream_id}")
     
     def process_frame(self, frame):
         """Process a video frame for SLAM"""
         with self.lock:
-            # Convert to grayscale for feature detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Detect features
-            kp, des = self.orb.detectAndCompute(gray, None)
-            
-            # Create visualization frame
-            slam_viz = frame.copy()
+            # Downscale first, then convert to grayscale for feature detection
+            small = cv2.resize(
+                frame, None, fx=self.slam_scale, fy=self.slam_scale,
+                interpolation=cv2.INTER_AREA,
+            )
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+            # Detect features; KeyPoint_convert gives the Nx2 float32
+            # coordinate array directly, without a Python loop over keypoints
+            kp, des = self._detect_and_compute(gray)
+            logger.debug(f"Stream {self.stream_id}: {len(kp)} keypoints detected")
+            kp_xy = (
+                cv2.KeyPoint_convert(kp)
+                if kp
+                else np.empty((0, 2), dtype=np.float32)
+            )
+
+            # Create visualization frame (in the downsampled space; upsampled
+            # once before encoding). Safe to reuse in place because the
+            # buffer is JPEG-encoded before the lock is released.
+            if self._viz_buf is None or self._viz_buf.shape != small.shape:
+                self._viz_buf = np.empty_like(small)
+            np.copyto(self._viz_buf, small)
+            slam_viz = self._viz_buf
             
             # Draw detected feature points
             cv2.drawKeypoints(slam_viz, kp, slam_viz, color=(0, 255, 0), flags=0)
@@ -47,25 +110,48 @@ class SLAMProcessor:
             if self.prev_frame is not None and self.prev_kp is not None and self.prev_des is not None and des is not None:
                 # Match features
                 try:
-                    matches = self.matcher.match(self.prev_des, des)
-                    # Sort by distance
-                    matches = sorted(matches, key=lambda x: x.distance)
-                    
-                    # Use top matches for movement estimation
-                    good_matches = matches[:30] if len(matches) > 30 else matches
+                    raw_matches = self._knn_match(self.prev_des, des)
+                    # Lowe's ratio test: keep matches clearly better than the
+                    # runner-up instead of sorting the whole list by distance
+                    good_matches = [
+                        pair[0]
+                        for pair in raw_matches
+                        if len(pair) == 2 and pair[0].distance < 0.75 * pair[1].distance
+                    ]
+                    # Cap the correspondences fed to the homography
+                    if len(good_matches) > 20:
+                        good_matches = heapq.nsmallest(
+                            20, good_matches, key=lambda m: m.distance
+                        )
                     
                     if len(good_matches) >= 8:  # Need at least 8 points for homography
-                        # Extract matched keypoints
-                        prev_pts = np.array([self.prev_kp[m.queryIdx].pt for m in good_matches], dtype=np.float32)
-                        curr_pts = np.array([kp[m.trainIdx].pt for m in good_matches], dtype=np.float32)
+                        # Extract matched keypoints via index arrays instead
+                        # of a Python loop over DMatch objects
+                        q_idx = np.fromiter(
+                            (m.queryIdx for m in good_matches),
+                            dtype=np.int32, count=len(good_matches),
+                        )
+                        t_idx = np.fromiter(
+                            (m.trainIdx for m in good_matches),
+                            dtype=np.int32, count=len(good_matches),
+                        )
+                        prev_pts = self.prev_kp_xy[q_idx]
+                        curr_pts = kp_xy[t_idx]
                         
-                        # Calculate homography
-                        H, mask = cv2.findHomography(prev_pts, curr_pts, cv2.RANSAC, 5.0)
+                        # Calculate homography with a capped, early-exiting search
+                        H, mask = cv2.findHomography(
+                            prev_pts, curr_pts,
+                            method=_HOMOGRAPHY_METHOD,
+                            ransacReprojThreshold=5.0,
+                            maxIters=500,
+                            confidence=0.99,
+                        )
                         
                         if H is not None:
-                            # Extract movement (translation) from homography
-                            tx = H[0, 2]
-                            ty = H[1, 2]
+                            # Extract movement (translation) from homography,
+                            # scaled back up to full-frame pixels
+                            tx = H[0, 2] / self.slam_scale
+                            ty = H[1, 2] / self.slam_scale
                             
                             # Update trajectory
                             if not self.trajectory:
@@ -101,9 +187,9 @@ class SLAMProcessor:
                     
                     # Draw matches on visualization frame
                     match_viz = cv2.drawMatches(
-                        self.prev_frame, self.prev_kp, 
-                        frame, kp, 
-                        good_matches, None, 
+                        self.prev_frame, self.prev_kp,
+                        small, kp,
+                        good_matches, None,
                         flags=cv2.DrawMatchesFlags_NOT_DRAW_SINGLE_POINTS
                     )
                     
@@ -121,23 +207,75 @@ class SLAMProcessor:
             self.prev_frame = gray.copy()
             self.prev_kp = kp
             self.prev_des = des
+            self.prev_kp_xy = kp_xy
             
             self.is_initialized = True
             
-            # Prepare result dict with visualizations
-            result = {
-                'slam_viz': self._encode_frame(slam_viz),
-                'map': self._encode_frame(self.map) if self.map is not None else None,
-                'matches': self._encode_frame(match_viz) if match_viz is not None else None,
-                'trajectory': self.trajectory.copy(),
-                'timestamp': cv2.getTickCount() / cv2.getTickFrequency()
-            }
-            
-            return result
+            # Upsample the viz back to the original frame size for the UI.
+            # resize materializes a fresh array, so it (and match_viz) can be
+            # encoded after the lock is released; the map encode stays inside
+            # because it reads self.map, which the next frame mutates in place
+            # (and it is usually served from the trajectory-length cache).
+            slam_viz = cv2.resize(slam_viz, (frame.shape[1], frame.shape[0]))
+            encoded_map = self._encode_map()
+            trajectory = self.trajectory.copy()
+
+        # Encode the remaining visualizations in parallel, off the lock so
+        # the next frame can start processing meanwhile
+        viz_future = _JPEG_POOL.submit(self._encode_frame, slam_viz)
+        match_future = (
+            _JPEG_POOL.submit(self._encode_frame, match_viz)
+            if match_viz is not None
+            else None
+        )
+        return {
+            'slam_viz': viz_future.result(),
+            'map': encoded_map,
+            'matches': match_future.result() if match_future is not None else None,
+            'trajectory': trajectory,
+            'timestamp': cv2.getTickCount() / cv2.getTickFrequency()
+        }
     
+    def _detect_and_compute(self, gray):
+        """Run ORB detection on the GPU when available, else on the CPU."""
+        if not self._use_cuda:
+            return self.orb.detectAndCompute(gray, None)
+        gpu_gray = cv2.cuda_GpuMat()
+        gpu_gray.upload(gray, self.cuda_stream)
+        kp_gpu, des_gpu = self.orb.detectAndComputeAsync(
+            gpu_gray, None, stream=self.cuda_stream
+        )
+        self.cuda_stream.waitForCompletion()
+        return self.orb.convert(kp_gpu), des_gpu.download()
+
+    def _knn_match(self, prev_des, des):
+        """k=2 descriptor matching on the GPU when available, else FLANN."""
+        if not self._use_cuda:
+            return self.matcher.knnMatch(prev_des, des, k=2)
+        gpu_prev = cv2.cuda_GpuMat()
+        gpu_prev.upload(prev_des)
+        gpu_curr = cv2.cuda_GpuMat()
+        gpu_curr.upload(des)
+        return self.matcher.knnMatch(gpu_prev, gpu_curr, k=2)
+
     def _encode_frame(self, frame):
         """Encode a frame to JPEG for web display"""
         success, encoded_img = cv2.imencode('.jpg', frame)
         if success:
             return encoded_img.tobytes()
         return None
+
+    def _encode_map(self):
+        """Encode the map, reusing the cached bytes while the trajectory is unchanged"""
+        if self.map is None:
+            return None
+        cached_bytes, cached_len = self._map_encode_cache
+        if cached_len == len(self.trajectory) and cached_bytes is not None:
+            return cached_bytes
+        # Lower quality is fine for the mostly-flat map content
+        success, encoded_img = cv2.imencode(
+            '.jpg', self.map, [cv2.IMWRITE_JPEG_QUALITY, 75]
+        )
+        encoded = encoded_img.tobytes() if success else None
+        self._map_encode_cache = (encoded, len(self.trajectory))
+        return encoded
@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 import logging
 import os
+import queue
+import threading
 import time
 from typing import Dict, Optional, Tuple, Any
 from server.server_config import config as server_config # Use the global config
@@ -9,6 +11,25 @@ from .slam_processor import SLAMProcessor
 
 logger = logging.getLogger("server.stream_manager")
 
+
+class _CudaVideoWriter:
+    """Minimal adapter giving a cv2.cudacodec writer the VideoWriter surface."""
+
+    def __init__(self, writer):
+        self._writer = writer
+        self._gpu = cv2.cuda_GpuMat()
+
+    def isOpened(self):
+        return True
+
+    def write(self, frame):
+        self._gpu.upload(frame)
+        self._writer.write(self._gpu)
+
+    def release(self):
+        self._writer.release()
+
+
 class StreamManager:
     def __init__(self):
         self.recordings_dir = server_config.VIDEO_STREAM_RECORDINGS_DIR
@@ -18,10 +39,21 @@ class StreamManager:
         
         self._recorders: Dict[str, Tuple[cv2.VideoWriter, str]] = {} # stream_id -> (recorder, filepath)
         self.slam_processors = {}  # To store SLAM processors by stream_id
+        # Depth-1 "latest frame" slots feeding one SLAM worker thread per
+        # stream, so slow SLAM frames are dropped instead of stalling ingest
+        self._slam_slots: Dict[str, Dict[str, Any]] = {}
         # If you wanted to re-implement live viewing via server (e.g., separate process or thread using OpenCV):
         # self._live_view_queues: Dict[str, queue.Queue] = {}
         # self._viewer_threads: Dict[str, threading.Thread] = {}
         self._is_shutting_down = False
+        self._slam_init_lock = threading.Lock()
+        # Image writes happen on a background thread so the WebSocket handler
+        # isn't serialized behind open/write/close filesystem latency during
+        # burst captures
+        self._image_write_q: queue.Queue = queue.Queue()
+        threading.Thread(
+            target=self._image_writer_loop, name="image-writer", daemon=True
+        ).start()
         logger.info(f"StreamManager initialized. Recordings to: {os.path.abspath(self.recordings_dir)}")
 
     def start_recording(self, stream_id: str, frame_width: int, frame_height: int, client_name: Optional[str] = None, fps: Optional[float] = None) -> bool:
@@ -35,9 +67,8 @@ class StreamManager:
         filename = f"{stream_id}{client_part}_{int(time.time())}{self.video_extension}"
         filepath = os.path.join(self.recordings_dir, filename)
         
-        fourcc = cv2.VideoWriter_fourcc(*self.default_codec)
         try:
-            recorder = cv2.VideoWriter(filepath, fourcc, actual_fps, (frame_width, frame_height))
+            recorder = self._create_recorder(filepath, actual_fps, (frame_width, frame_height))
             if not recorder.isOpened():
                 logger.error(f"Failed to open VideoWriter for {stream_id} at {filepath}.")
                 return False
@@ -48,6 +79,21 @@ class StreamManager:
             logger.exception(f"Error creating VideoWriter for {stream_id}: {e}")
             return False
 
+    def _create_recorder(self, filepath: str, fps: float, frame_size: Tuple[int, int]):
+        """Prefer NVENC fixed-function encoding when the build and a CUDA
+        device support it; the software mp4v writer stays the fallback."""
+        try:
+            if hasattr(cv2, 'cudacodec') and cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                writer = cv2.cudacodec.createVideoWriter(
+                    filepath, frame_size, cv2.cudacodec.Codec_H264, fps
+                )
+                logger.info(f"Using NVENC hardware encoder for {filepath}")
+                return _CudaVideoWriter(writer)
+        except Exception as e:
+            logger.debug(f"Hardware encoder unavailable ({e}); using software VideoWriter.")
+        fourcc = cv2.VideoWriter_fourcc(*self.default_codec)
+        return cv2.VideoWriter(filepath, fourcc, fps, frame_size)
+
     def stop_recording(self, stream_id: str) -> Optional[str]:
         if stream_id not in self._recorders: return None
         recorder_tuple = self._recorders.pop(stream_id, None)
@@ -63,7 +109,19 @@ class StreamManager:
 
     def process_video_frame(self, stream_id: str, frame_data: bytes, client_info_ref: Any):
         if self._is_shutting_down: return
-    
+
+        stream_params = client_info_ref.active_streams.get(stream_id, {})
+
+        # Keep the latest encoded frame for pass-through consumers (MJPEG-style
+        # viewing); the buffer stays alive through this reference, no copy.
+        stream_params['latest_jpeg'] = frame_data
+
+        # JPEG decode (IDCT + a W*H*3 allocation) is the most expensive step
+        # on this path — skip it entirely unless a consumer needs the pixels.
+        if not (stream_params.get('slam_enabled', False)
+                or stream_params.get('is_recording', False)):
+            return
+
         try:
             nparr = np.frombuffer(frame_data, np.uint8)
             frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
@@ -73,22 +131,29 @@ class StreamManager:
         except Exception as e:
             logger.exception(f"Stream {stream_id}: Error decoding video frame: {e}")
             return
-    
-        stream_params = client_info_ref.active_streams.get(stream_id, {})
-        
-        # Process with SLAM if enabled for this stream
+
+
+        # Hand the frame to the SLAM worker if enabled for this stream. Newer
+        # frames overwrite the slot, so SLAM running slower than the ingest
+        # rate drops intermediate frames instead of delaying recording.
         if stream_params.get('slam_enabled', False):
             if stream_id not in self.slam_processors:
                 self.initialize_slam(stream_id, client_info_ref.name)
-            
-            if stream_id in self.slam_processors:
-                try:
-                    # Process frame through SLAM and get visualization
-                    slam_result = self.slam_processors[stream_id].process_frame(frame)
-                    # Store the most recent SLAM result for UI access
-                    stream_params['latest_slam_result'] = slam_result
-                except Exception as e:
-                    logger.exception(f"Error processing SLAM for stream {stream_id}: {e}")
+
+            # Temporal subsampling: 5-10 Hz is plenty for the 2D trajectory,
+            # and the larger inter-frame baseline suits the homography better.
+            # latest_slam_result is retained between runs so the UI stays
+            # stable on skipped frames.
+            counter = stream_params.get('slam_frame_counter', 0)
+            stream_params['slam_frame_counter'] = counter + 1
+            skip = stream_params.setdefault('slam_frame_skip', 2)
+
+            slot = self._slam_slots.get(stream_id)
+            if slot is not None and counter % (skip + 1) == 0:
+                with slot['lock']:
+                    slot['frame'] = frame
+                    slot['stream_params'] = stream_params
+                slot['event'].set()
         
         # Handle recording (existing code)
         if stream_params.get('is_recording', False):
@@ -113,27 +178,82 @@ class StreamManager:
             filename = f"img_{client_name.replace(' ', '_')}_{timestamp}_seq{sequence}.{image_format.lower()}"
             filepath = os.path.join(server_config.IMAGE_OUTPUT_DIR, filename) # Use config directly
 
-            with open(filepath, "wb") as f:
-                f.write(image_data)
-            logger.info(f"Saved image from {client_name}, seq {sequence}, to: {filepath} ({len(image_data)} bytes)")
+            # Queue for the writer thread; the payload buffer stays alive via
+            # the queued reference, so no copy is needed here
+            self._image_write_q.put((filepath, image_data, client_name, sequence))
             return filepath
         except Exception as e:
-            logger.exception(f"Error saving image data from {client_name}, seq {sequence}: {e}")
+            logger.exception(f"Error queueing image data from {client_name}, seq {sequence}: {e}")
             return None
 
+    def _image_writer_loop(self):
+        """Drain queued images to disk with a single open/write/close each."""
+        while True:
+            item = self._image_write_q.get()
+            if item is None:
+                break
+            filepath, image_data, client_name, sequence = item
+            try:
+                fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    os.write(fd, image_data)
+                finally:
+                    os.close(fd)
+                logger.info(f"Saved image from {client_name}, seq {sequence}, to: {filepath} ({len(image_data)} bytes)")
+            except Exception as e:
+                logger.exception(f"Error saving image data from {client_name}, seq {sequence}: {e}")
+        logger.debug("Image writer thread exiting.")
+
     def shutdown(self):
         logger.info("Shutting down StreamManager...")
         self._is_shutting_down = True
         for stream_id in list(self._recorders.keys()):
             self.stop_recording(stream_id)
         self._recorders.clear()
+        self._image_write_q.put(None)  # Let the writer thread drain and exit
         logger.info("StreamManager shutdown complete.")
     def initialize_slam(self, stream_id, client_id):
-        """Initialize SLAM processing for a stream."""
-        if stream_id not in self.slam_processors:
+        """Initialize SLAM processing (processor + worker thread) for a stream."""
+        # Guarded: the video worker thread and the slam toggle endpoint can
+        # both arrive here for the same stream
+        with self._slam_init_lock:
+            if stream_id in self.slam_processors:
+                return False
             self.slam_processors[stream_id] = SLAMProcessor(client_id, stream_id)
+            self._slam_slots[stream_id] = {
+                'frame': None,
+                'stream_params': None,
+                'lock': threading.Lock(),
+                'event': threading.Event(),
+            }
+            threading.Thread(
+                target=self._slam_worker_loop,
+                args=(stream_id,),
+                name=f"slam-{stream_id}",
+                daemon=True,
+            ).start()
             return True
-        return False
+
+    def _slam_worker_loop(self, stream_id: str):
+        """Consume the latest frame for a stream and run SLAM on it."""
+        slot = self._slam_slots[stream_id]
+        processor = self.slam_processors[stream_id]
+        while not self._is_shutting_down:
+            if not slot['event'].wait(timeout=0.5):
+                continue
+            slot['event'].clear()
+            with slot['lock']:
+                frame = slot['frame']
+                stream_params = slot['stream_params']
+                slot['frame'] = None
+            if frame is None or stream_params is None:
+                continue
+            try:
+                # Process frame through SLAM and publish for UI access
+                stream_params['latest_slam_result'] = processor.process_frame(frame)
+            except Exception as e:
+                logger.exception(f"Error processing SLAM for stream {stream_id}: {e}")
+        logger.debug(f"SLAM worker for stream {stream_id} exiting.")
 
 # Global instance
 stream_manager = StreamManager()
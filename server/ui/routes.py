@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+import jinja2
 import os
+import tempfile
 import time
 
 from server.connection_manager import manager
@@ -11,28 +13,42 @@ from server.server_config import config
 templates_path = os.path.join(os.path.dirname(__file__), "templates")
 templates = Jinja2Templates(directory=templates_path)
 
+# Cache compiled templates as pickled ASTs on disk (shared across workers and
+# restarts) and skip the per-request template re-stat; the templates don't
+# change in production.
+_jinja_cache_dir = os.path.join(tempfile.gettempdir(), "orka_jinja")
+os.makedirs(_jinja_cache_dir, exist_ok=True)
+templates.env.bytecode_cache = jinja2.FileSystemBytecodeCache(_jinja_cache_dir)
+templates.env.auto_reload = False
+
 # Create router
 router = APIRouter(tags=["UI"])
 
 @router.get("/dashboard")
 async def dashboard(request: Request):
     """Dashboard main page with client list and controls"""
+    now = time.monotonic()
     clients_data = {}
     for cid, cinfo in manager.active_connections.items():
+        # One pass over the streams dict yields both lists
+        active_streams = []
+        streams_recording = []
+        for sid, s_params in cinfo.active_streams.items():
+            active_streams.append(sid)
+            if s_params.get('is_recording'):
+                streams_recording.append(sid)
         clients_data[cid] = {
             "name": cinfo.name,
             "platform": cinfo.platform,
-            "capabilities": sorted(list(cinfo.capabilities)),
-            "connected_since": time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(cinfo.registration_time)),
-            "last_seen_ago_s": f"{time.monotonic() - cinfo.last_seen_time:.1f}",
-            "active_streams": list(cinfo.active_streams.keys()),
-            "streams_recording": [sid for sid, s_params in cinfo.active_streams.items() 
-                                if s_params.get('is_recording')]
+            "capabilities": cinfo.sorted_capabilities,
+            "connected_since": cinfo.connected_since_str,
+            "last_seen_ago_s": f"{now - cinfo.last_seen_time:.1f}",
+            "active_streams": active_streams,
+            "streams_recording": streams_recording
         }
     
     return templates.TemplateResponse(
-        "index.html", 
-        {"request": request, "clients": clients_data}
+        request, "index.html", {"clients": clients_data}
     )
 
 @router.get("/clients/{client_id}")
@@ -45,9 +61,8 @@ async def client_detail(request: Request, client_id: str):
         "client_id": client_id,
         "name": client_info.name,
         "platform": client_info.platform,
-        "registration_time": time.strftime('%Y-%m-%d %H:%M:%S', 
-                                            time.gmtime(client_info.registration_time)),
-        "capabilities": sorted(list(client_info.capabilities)),
+        "registration_time": client_info.connected_since_str,
+        "capabilities": client_info.sorted_capabilities,
         "active_streams": client_info.active_streams, # <--- CHANGE HERE
         "streams_recording": [
             sid for sid, p in client_info.active_streams.items() if p.get("is_recording")
@@ -55,8 +70,7 @@ async def client_detail(request: Request, client_id: str):
     }
 
     return templates.TemplateResponse(
-        "client_details.html",
-        {"request": request, "client": client}
+        request, "client_details.html", {"client": client}
     )
     
 @router.get("/client_card_html/{client_id}")
@@ -70,20 +84,26 @@ async def client_card_html(request: Request, client_id: str):
         print(f"Client not found with ID: {client_id}")
         raise HTTPException(status_code=404, detail="Client not found")
     
+    active_streams = []
+    streams_recording = []
+    for sid, s_params in client_info.active_streams.items():
+        active_streams.append(sid)
+        if s_params.get('is_recording'):
+            streams_recording.append(sid)
     client = {
         "name": client_info.name,
         "platform": client_info.platform,
-        "capabilities": sorted(list(client_info.capabilities)),
-        "connected_since": time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(client_info.registration_time)),
+        "capabilities": client_info.sorted_capabilities,
+        "connected_since": client_info.connected_since_str,
         "last_seen_ago_s": f"{time.monotonic() - client_info.last_seen_time:.1f}",
-        "active_streams": list(client_info.active_streams.keys()),
-        "streams_recording": [sid for sid, s_params in client_info.active_streams.items() 
-                              if s_params.get('is_recording')]
+        "active_streams": active_streams,
+        "streams_recording": streams_recording
     }
     
     return templates.TemplateResponse(
-        "components/client_card.html", 
-        {"request": request, "client": client, "client_id": client_id},
+        request,
+        "components/client_card.html",
+        {"client": client, "client_id": client_id},
         media_type="text/html"
     )
         
@@ -91,12 +111,8 @@ async def client_card_html(request: Request, client_id: str):
 @router.get("/streams/{stream_id}/status")
 async def stream_status(stream_id: str):
     """Get status of a specific stream"""
-    found_client = None
-    for client in manager.active_connections.values():
-        if stream_id in client.active_streams:
-            found_client = client
-            break
-    
+    found_client = manager.get_client_by_stream(stream_id)
+
     if not found_client:
         raise HTTPException(status_code=404, detail=f"Stream ID '{stream_id}' not found or not active")
     
@@ -125,9 +141,9 @@ async def stream_viewer(request: Request, client_id: str, stream_id: str):
     stream_info = client.active_streams[stream_id]
     
     return templates.TemplateResponse(
+        request,
         "stream_viewer.html",
         {
-            "request": request,
             "client": client,
             "client_id": client_id,
             "stream_id": stream_id,
@@ -1,11 +1,23 @@
 from typing import Optional, List, Dict, Any, Union
 from pydantic import BaseModel, Field
-import uuid
+import itertools
+import secrets
+
+# Ids only need to be unique, not unpredictable: a random per-process prefix
+# plus a monotonic counter avoids a uuid4 (getrandom syscall + hex format)
+# per model instantiation.
+_ID_PREFIX = secrets.token_hex(3)
+_ID_COUNTER = itertools.count()
+
+
+def _next_id(kind: str) -> str:
+    return f"{kind}_{_ID_PREFIX}{next(_ID_COUNTER):x}"
+
 
 # --- General Purpose Models ---
 
 class Command(BaseModel):
-    command_id: str = Field(default_factory=lambda: f"cmd_{uuid.uuid4().hex[:8]}")
+    command_id: str = Field(default_factory=lambda: _next_id("cmd"))
     action: str # e.g., "capture_image", "speak_text"
     params: Optional[Dict[str, Any]] = None
 
@@ -62,7 +74,7 @@ class CaptureImageResponseData(BaseModel):
 
 # Start Video Stream
 class StartVideoStreamParams(BaseModel):
-    stream_id: Optional[str] = Field(default_factory=lambda: f"stream_{uuid.uuid4().hex[:8]}")
+    stream_id: Optional[str] = Field(default_factory=lambda: _next_id("stream"))
     fps: Optional[int] = 10
     width: Optional[int] = 640
     height: Optional[int] = 480
@@ -97,6 +109,25 @@ ServerMessagePayload = Union[
     MediaAck        # Server acknowledging receipt of binary media
 ]
 
+# Wrapper-type -> payload model maps for O(1) dispatch. Payloads don't carry
+# their own tag on the wire, so the WebSocketMessage `type` field acts as the
+# discriminator; dispatchers look the model up here and model_validate once
+# instead of walking an if/elif chain per message.
+CLIENT_PAYLOAD_MODELS: Dict[str, Any] = {
+    "register": ClientRegistration,
+    "command_response": CommandResponse,
+    "ping": PingMessage,
+    "stream_status": StreamStatusUpdate,
+}
+
+SERVER_PAYLOAD_MODELS: Dict[str, Any] = {
+    "ack_registration": ServerAck,
+    "command": Command,
+    "pong": PongMessage,
+    "media_ack": MediaAck,
+    "command_response": CommandResponse,
+}
+
 # Message wrapper for JSON WebSocket communication
 # All text messages will be of this type
 class WebSocketMessage(BaseModel):
@@ -1,5 +1,12 @@
+import hashlib
+import json
 import logging
+import os
+import queue
+import shutil
 import subprocess
+import threading
+import time
 
 import config
 
@@ -18,6 +25,24 @@ except ImportError:
         "SpeechRecognition library not found. RPi/Desktop STT will not work unless installed."
     )
     sr = None  # type: ignore
+try:
+    import sounddevice
+    import soundfile
+except ImportError:
+    logging.debug(
+        "sounddevice/soundfile not found. Cached TTS audio will play via aplay."
+    )
+    sounddevice = None  # type: ignore
+    soundfile = None  # type: ignore
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    logging.info(
+        "faster-whisper library not found. STT will fall back to Google Web Speech."
+    )
+    WhisperModel = None  # type: ignore
+
 try:
     import pyaudio  # noqa: F401
 
@@ -33,6 +58,93 @@ except ImportError:
 
 # TTS
 
+# Loading the eSpeak/SAPI driver dominates per-utterance latency, so keep one
+# engine alive for the process instead of init/stop per call.
+_tts_engine = None
+_tts_lock = threading.Lock()
+
+# Probe the audio tools once at import instead of forking `which` (or just
+# failing a spawn) on every utterance
+_HAS_APLAY = shutil.which("aplay") is not None
+_HAS_ESPEAK = shutil.which("espeak") is not None
+_HAS_FESTIVAL = shutil.which("festival") is not None
+
+
+def _get_tts_engine():
+    """Return the shared pyttsx3 engine, creating it on first use."""
+    global _tts_engine
+    if pyttsx3 is None:
+        return None
+    with _tts_lock:
+        if _tts_engine is None:
+            _tts_engine = pyttsx3.init()
+            # Optional: Adjust properties
+            # voices = _tts_engine.getProperty('voices')
+            # _tts_engine.setProperty('voice', voices[0].id) # Change voice if needed
+            # _tts_engine.setProperty('rate', 150) # Speed percent (can go over 100)
+            # _tts_engine.setProperty('volume', 0.9) # Volume 0-1
+    return _tts_engine
+
+
+# On-disk cache of synthesized audio keyed by platform+text. Repeated bot
+# phrases (prompts, error lines) skip synthesis entirely and just replay the
+# WAV; a small JSON index tracks access times for LRU eviction.
+_TTS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "orka", "tts")
+_TTS_CACHE_INDEX = os.path.join(_TTS_CACHE_DIR, "index.json")
+_TTS_CACHE_MAX_BYTES = 10 * 1024 * 1024
+
+
+def _tts_cache_path(text):
+    key = hashlib.sha256(f"{config.PLATFORM}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(_TTS_CACHE_DIR, f"{key}.wav")
+
+
+def _tts_cache_touch(path):
+    """Record an access and evict least-recently-used entries over budget."""
+    try:
+        index = {}
+        if os.path.exists(_TTS_CACHE_INDEX):
+            with open(_TTS_CACHE_INDEX) as f:
+                index = json.load(f)
+        index[os.path.basename(path)] = [time.time(), os.path.getsize(path)]
+
+        total = sum(size for _, size in index.values())
+        if total > _TTS_CACHE_MAX_BYTES:
+            for name, (_, size) in sorted(index.items(), key=lambda kv: kv[1][0]):
+                if total <= _TTS_CACHE_MAX_BYTES:
+                    break
+                try:
+                    os.remove(os.path.join(_TTS_CACHE_DIR, name))
+                except OSError:
+                    pass
+                del index[name]
+                total -= size
+
+        with open(_TTS_CACHE_INDEX, "w") as f:
+            json.dump(index, f)
+    except Exception as e:
+        logging.debug(f"TTS cache index update failed: {e}")
+
+
+def _play_wav(path):
+    """Play a WAV, preferring direct PCM output over an aplay subprocess."""
+    if sounddevice is not None and soundfile is not None:
+        # Straight to the audio device: no fork and no TTS daemon round-trip.
+        # Blocking keeps queued sentences in order.
+        try:
+            data, sample_rate = soundfile.read(path, dtype="int16")
+            sounddevice.play(data, sample_rate)
+            sounddevice.wait()
+            return True
+        except Exception as e:
+            logging.warning(f"sounddevice playback failed: {e}")
+    try:
+        subprocess.run(["aplay", "-q", path], check=True, capture_output=True)
+        return True
+    except (subprocess.SubprocessError, FileNotFoundError) as e:
+        logging.warning(f"Playback of cached TTS audio failed: {e}")
+        return False
+
 
 def _speak_termux(text):
     """Uses Termux:API for TTS."""
@@ -91,30 +203,46 @@ def _speak_termux(text):
 
 def _speak_rpi_desktop(text):
     """Uses pyttsx3 for TTS on RPi/Desktop."""
-    if pyttsx3 is None:
+    engine = _get_tts_engine()
+    if engine is None:
         logging.error("pyttsx3 library not available for TTS.")
         return False
     logging.info("Attempting TTS via pyttsx3...")
     try:
-        # Check if aplay is available on Linux systems
+        # Check for a playback path on Linux systems (sounddevice or aplay)
         if config.PLATFORM == "linux" or config.PLATFORM == "rpi":
-            try:
-                subprocess.run(["which", "aplay"], check=True, capture_output=True)
-            except subprocess.CalledProcessError:
+            if not _HAS_APLAY and sounddevice is None:
                 logging.error(
                     "aplay command not found. Install with: sudo apt-get install alsa-utils or wtv is there in your distro"
                 )
                 return False
 
-        engine = pyttsx3.init()
-        # Optional: Adjust properties
-        # voices = engine.getProperty('voices')/
-        # engine.setProperty('voice', voices[0].id) # Change voice if needed
-        # engine.setProperty('rate', 150) # Speed percent (can go over 100)
-        # engine.setProperty('volume', 0.9) # Volume 0-1
-        engine.say(text)
-        engine.runAndWait()
-        engine.stop()  # Clean up engine resources
+            # Synthesize through the disk cache: a hit skips the engine
+            # entirely, a miss renders to the cache file then plays it
+            wav_path = _tts_cache_path(text)
+            if not (os.path.exists(wav_path) and os.path.getsize(wav_path) > 0):
+                os.makedirs(_TTS_CACHE_DIR, exist_ok=True)
+                with _tts_lock:
+                    engine.save_to_file(text, wav_path)
+                    engine.runAndWait()
+            else:
+                logging.debug("TTS cache hit, replaying synthesized audio.")
+            # A failed/interrupted synthesis must not leave a truncated file
+            # behind, or it would be "replayed" on every later call
+            if not (os.path.exists(wav_path) and os.path.getsize(wav_path) > 0):
+                logging.warning("TTS synthesis produced no audio file.")
+                try:
+                    os.remove(wav_path)
+                except OSError:
+                    pass
+            elif _play_wav(wav_path):
+                _tts_cache_touch(wav_path)
+                return True
+            # Playback trouble: fall through to direct engine output
+
+        with _tts_lock:
+            engine.say(text)
+            engine.runAndWait()
         logging.info("pyttsx3 TTS executed successfully.")
         return True
     except Exception as e:
@@ -122,40 +250,68 @@ def _speak_rpi_desktop(text):
         return False
 
 
+# Long-lived fallback processes fed over stdin: no temp file on disk and no
+# fork/exec per sentence. Restarted transparently if they die.
+_espeak_proc = None
+_festival_proc = None
+_fallback_lock = threading.Lock()
+
+
+def _pipe_to_espeak(text):
+    global _espeak_proc
+    with _fallback_lock:
+        try:
+            if _espeak_proc is None or _espeak_proc.poll() is not None:
+                _espeak_proc = subprocess.Popen(
+                    ["espeak", "--stdin"], stdin=subprocess.PIPE, text=True
+                )
+            _espeak_proc.stdin.write(text.replace("\n", " ") + "\n")
+            _espeak_proc.stdin.flush()
+            return True
+        except (OSError, subprocess.SubprocessError, BrokenPipeError) as e:
+            logging.warning(f"espeak pipe failed: {e}")
+            _espeak_proc = None
+            return False
+
+
+def _pipe_to_festival(text):
+    global _festival_proc
+    with _fallback_lock:
+        try:
+            if _festival_proc is None or _festival_proc.poll() is not None:
+                _festival_proc = subprocess.Popen(
+                    ["festival", "--pipe"], stdin=subprocess.PIPE, text=True
+                )
+            escaped = text.replace("\\", "\\\\").replace('"', '\\"')
+            _festival_proc.stdin.write(f'(SayText "{escaped}")\n')
+            _festival_proc.stdin.flush()
+            return True
+        except (OSError, subprocess.SubprocessError, BrokenPipeError) as e:
+            logging.warning(f"festival pipe failed: {e}")
+            _festival_proc = None
+            return False
+
+
 def _speak_linux_fallback(text):
     """Uses system commands for TTS when pyttsx3 isn't available."""
     logging.info("Attempting TTS via Linux system commands...")
 
     # Try espeak first (widely available)
-    try:
-        import subprocess
-
-        subprocess.run(["espeak", text], check=True)
-        logging.info("espeak TTS executed successfully.")
+    if _HAS_ESPEAK and _pipe_to_espeak(text):
+        logging.info("espeak TTS dispatched.")
         return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        logging.warning("espeak not available or failed.")
 
     # Try festival as fallback
-    try:
-        with open("/tmp/roastyy_tts.txt", "w") as f:
-            f.write(text)
-        subprocess.run(["festival", "--tts", "/tmp/roastyy_tts.txt"], check=True)
-        logging.info("festival TTS executed successfully.")
+    if _HAS_FESTIVAL and _pipe_to_festival(text):
+        logging.info("festival TTS dispatched.")
         return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        logging.warning("festival not available or failed.")
 
     logging.error("All Linux TTS fallbacks failed.")
     return False
 
 
-def speak(text, agent_name="Agent"):
-    """Speaks the given text using the appropriate platform method."""
-    if not text:
-        logging.warning("Speak function called with empty text.")
-        return
-
+def _speak_now(text, agent_name="Agent"):
+    """Speak text synchronously using the appropriate platform method."""
     success = False
     logging.debug(f"Speak request for platform '{config.PLATFORM}': '{text[:50]}...'")
 
@@ -179,6 +335,86 @@ def speak(text, agent_name="Agent"):
         logging.info("TTS failed, fell back to printing text.")
 
 
+# speak() only enqueues: synthesis and playback run on this worker thread so
+# the caller can move on (e.g. issue the next model request) while the
+# previous sentence is still being spoken. The queue keeps utterances ordered.
+_tts_queue: queue.Queue = queue.Queue()
+
+
+def _tts_worker():
+    while True:
+        item = _tts_queue.get()
+        if isinstance(item, threading.Event):  # flush marker
+            item.set()
+            continue
+        text, agent_name = item
+
+        # Coalesce bursts: anything queued within 50 ms joins this synthesis
+        # call, halving the per-utterance fixed cost for multi-line replies.
+        batch = [text]
+        flush_events = []
+        while True:
+            try:
+                next_item = _tts_queue.get(timeout=0.05)
+            except queue.Empty:
+                break
+            if isinstance(next_item, threading.Event):
+                flush_events.append(next_item)
+                break
+            batch.append(next_item[0])
+
+        try:
+            _speak_now(" ".join(batch), agent_name)
+        except Exception as e:
+            logging.exception(f"Error in TTS worker: {e}")
+        for event in flush_events:
+            event.set()
+
+
+threading.Thread(target=_tts_worker, name="tts-worker", daemon=True).start()
+
+
+def warmup():
+    """Pre-initializes the audio stack so the first real call is already hot.
+
+    Meant to run on a background thread at startup: loads the TTS driver,
+    enumerates microphones, opens/closes the mic once, and loads the local
+    STT model when installed.
+    """
+    global _mic_names
+    try:
+        _get_tts_engine()
+    except Exception as e:
+        logging.debug(f"TTS warm-up skipped: {e}")
+    if sr is not None:
+        try:
+            _mic_names = sr.Microphone.list_microphone_names()
+            with sr.Microphone(sample_rate=16000, chunk_size=320):
+                pass
+        except Exception as e:
+            logging.debug(f"Microphone warm-up skipped: {e}")
+    try:
+        _get_whisper_model()
+    except Exception as e:
+        logging.debug(f"STT model warm-up skipped: {e}")
+    logging.debug("Audio stack warm-up finished.")
+
+
+def speak(text, agent_name="Agent"):
+    """Queues text for speech; playback happens on a background thread."""
+    if not text:
+        logging.warning("Speak function called with empty text.")
+        return
+    _tts_queue.put((text, agent_name))
+
+
+def speak_flush(timeout=None):
+    """Blocks until everything queued so far has been spoken."""
+    done = threading.Event()
+    _tts_queue.put(done)
+    done.wait(timeout)
+
+
 # SST
 
 
@@ -211,35 +447,95 @@ def _listen_termux():
         return None
 
 
+# Local transcription via faster-whisper (CTranslate2, int8) when installed:
+# no upload, no network round-trip, and built-in VAD trims silence. Falls
+# back to Google Web Speech otherwise.
+_whisper_model = None
+_whisper_lock = threading.Lock()
+
+
+def _get_whisper_model():
+    global _whisper_model
+    if WhisperModel is None:
+        return None
+    with _whisper_lock:
+        if _whisper_model is None:
+            logging.info("Loading faster-whisper model (first call only)...")
+            _whisper_model = WhisperModel("small", compute_type="int8")
+    return _whisper_model
+
+
+def _transcribe_local(audio):
+    """Transcribe captured audio locally; returns None when unavailable."""
+    model = _get_whisper_model()
+    if model is None:
+        return None
+    try:
+        from io import BytesIO
+
+        segments, _info = model.transcribe(
+            BytesIO(audio.get_wav_data()), beam_size=1, vad_filter=True
+        )
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return text or None
+    except Exception as e:
+        logging.error(f"faster-whisper transcription failed: {e}")
+        return None
+
+
+# STT state shared across listen() calls: a fresh Recognizer, microphone
+# enumeration and ambient calibration cost about a second each per call
+_recognizer = None
+_mic_names = None
+_last_ambient_time = 0.0
+_AMBIENT_RECAL_SECONDS = 300
+
+
+def _get_recognizer():
+    global _recognizer
+    if _recognizer is None:
+        _recognizer = sr.Recognizer()
+        # Optional: Adjust energy threshold dynamically
+        # _recognizer.pause_threshold = 0.8 # seconds of non-speaking audio before phrase is considered complete
+        _recognizer.energy_threshold = 300
+        _recognizer.dynamic_energy_threshold = True
+        # End-pointing: the defaults wait a guaranteed 2s after speech stops.
+        # Short command-style phrases don't need that.
+        _recognizer.pause_threshold = 0.6
+        _recognizer.non_speaking_duration = 0.3
+        _recognizer.phrase_threshold = 0.15
+        _recognizer.operation_timeout = 5
+    return _recognizer
+
+
 def _listen_rpi_desktop():
     """Uses SpeechRecognition library for STT on RPi/Desktop."""
+    global _mic_names, _last_ambient_time
     if sr is None:
         logging.error("SpeechRecognition library not available for STT.")
         return None
 
-    r = sr.Recognizer()
-    # Optional: Adjust energy threshold dynamically
-    # r.dynamic_energy_threshold = True
-    # r.pause_threshold = 0.8 # seconds of non-speaking audio before phrase is considered complete
-    r.energy_threshold = 300
-    r.dynamic_energy_threshold = True
-    r.pause_threshold = 2  # after these many seconds of pause, phrase completed
-    mic_list = sr.Microphone.list_microphone_names()
-    logging.debug(f"Available microphones: {mic_list}")
+    r = _get_recognizer()
+    if _mic_names is None:
+        _mic_names = sr.Microphone.list_microphone_names()
+        logging.debug(f"Available microphones: {_mic_names}")
     # You might need to specify device_index if default doesn't work
     # mic = sr.Microphone(device_index=?)
 
-    # Use the specified device index if available
-    mic_kwargs = {}
+    # Use the specified device index if available. 20 ms chunks at 16 kHz
+    # keep end-pointing granular instead of the default 64 ms buffers.
+    mic_kwargs = {"sample_rate": 16000, "chunk_size": 320}
     if hasattr(config, "MIC_DEVICE_INDEX") and config.MIC_DEVICE_INDEX is not None:
         mic_kwargs["device_index"] = config.MIC_DEVICE_INDEX
     with sr.Microphone(**mic_kwargs) as source:
         print("Listening via Microphone... Speak now!")
         try:
-            # Add ambient noise adjustment with longer duration
-            print("Adjusting for ambient noise... (wait)")
-            r.adjust_for_ambient_noise(source)
-            logging.info("Adjusted for ambient noise. Listening...")
+            # Ambient calibration only every few minutes, not per utterance
+            if time.time() - _last_ambient_time > _AMBIENT_RECAL_SECONDS:
+                print("Adjusting for ambient noise... (wait)")
+                r.adjust_for_ambient_noise(source, duration=0.3)
+                _last_ambient_time = time.time()
+                logging.info("Adjusted for ambient noise. Listening...")
 
             audio = r.listen(
                 source, timeout=10, phrase_time_limit=15
@@ -254,6 +550,13 @@ def _listen_rpi_desktop():
             logging.error(f"Error capturing audio: {e}")
             return None
 
+    # Prefer the local model when installed
+    local_text = _transcribe_local(audio)
+    if local_text:
+        logging.info(f"faster-whisper recognized: '{local_text}'")
+        print(f"(Heard: {local_text})")
+        return local_text
+
     try:
         # Recognize speech using Google Web Speech API (requires internet)
         recognized_text = r.recognize_google(audio)  # type: ignore
@@ -1,95 +1,564 @@
+import asyncio
+import functools
+import hashlib
+import json
 import logging
-
-from google import genai
-from google.genai import types
-from PIL import Image
+import mimetypes
+import mmap
+import os
+import random
+import re
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
 
 import config
 
-try:
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-    logging.info("Gemini AI configured successfully.")
-except Exception as e:
-    logging.error(f"Error configuring Gemini AI: {e}")
-    raise
+# google.genai (gRPC/protobuf stack) and PIL together add hundreds of ms to
+# every cold start, even for sessions that never touch the API. Both are
+# imported lazily: the client is built on first use, where the cost hides
+# behind the first request's network latency.
+_tls = threading.local()
+
+
+def _build_client():
+    """Construct a Gemini client.
+
+    Multiplexes concurrent requests over one persistent TLS connection:
+    HTTP/2 plus a long keep-alive removes the per-call handshake (~1 RTT)
+    that dominates burst latency. Falls back to the default transport when
+    the http2 extra (h2) isn't installed. Request time is bounded so a hung
+    connection surfaces as a retryable error instead of stalling the
+    conversation loop.
+    """
+    import httpx
+    from google import genai
+    from google.genai import types
+
+    http_args = {
+        "http2": True,
+        "limits": httpx.Limits(
+            max_keepalive_connections=20, keepalive_expiry=300
+        ),
+    }
+    try:
+        try:
+            built = genai.Client(
+                api_key=config.GEMINI_API_KEY,
+                http_options=types.HttpOptions(
+                    timeout=15_000,
+                    client_args=http_args,
+                    async_client_args=http_args,
+                ),
+            )
+        except ImportError as e:
+            logging.warning(
+                "HTTP/2 transport unavailable (%s); using default.", e
+            )
+            built = genai.Client(
+                api_key=config.GEMINI_API_KEY,
+                http_options=types.HttpOptions(timeout=15_000),
+            )
+        logging.info("Gemini AI configured successfully.")
+        return built
+    except Exception as e:
+        logging.error("Error configuring Gemini AI: %s", e)
+        raise
+
+
+def _get_client():
+    """Return this thread's Gemini client, building it on first use.
+
+    One client per thread keeps the TTS/STT workers and the asyncio loop
+    off each other's httpx pool locks; within a thread the keep-alive pool
+    still amortizes the TLS handshake.
+    """
+    client = getattr(_tls, "client", None)
+    if client is None:
+        client = _build_client()
+        _tls.client = client
+    return client
+
+
+# Transient API failures (rate limits, 5xx) are retried with exponential
+# backoff instead of surfacing an error string and losing the user's turn
+_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_TRANSIENT_EXC = None
+
+
+def _transient_exc():
+    global _TRANSIENT_EXC
+    if _TRANSIENT_EXC is None:
+        try:
+            from google.genai import errors as genai_errors
+
+            _TRANSIENT_EXC = (genai_errors.APIError,)
+        except ImportError:  # older SDKs without the errors module
+            _TRANSIENT_EXC = (Exception,)
+    return _TRANSIENT_EXC
+
+
+def _is_retryable(exc):
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    return code in _RETRYABLE_STATUS_CODES
+
+
+def retry_transient(max_attempts=3, base=0.5):
+    """Decorator retrying rate-limit/5xx API errors with jittered backoff."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_attempts):
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    if (
+                        not isinstance(e, _transient_exc())
+                        or attempt == max_attempts - 1
+                        or not _is_retryable(e)
+                    ):
+                        raise
+                    delay = base * 2 ** attempt + random.uniform(0, 0.1)
+                    logging.warning(
+                        "Transient Gemini error (%s); retrying in %.1fs", e, delay
+                    )
+                    time.sleep(delay)
+
+        return wrapper
+
+    return decorator
+
+
+def _call_with_retry(fn, *args, **kwargs):
+    return retry_transient()(fn)(*args, **kwargs)
 
 try:
     # We don't need to initialize models explicitly with the new API
     # Just keep track of model names
     vision_model_name = config.VISION_MODEL_NAME
     text_model_name = config.TEXT_MODEL_NAME
-    logging.info(f"Initialized Vision Model: {vision_model_name}")
-    logging.info(f"Initialized Text Model: {text_model_name}")
+    logging.info("Initialized Vision Model: %s", vision_model_name)
+    logging.info("Initialized Text Model: %s", text_model_name)
 except Exception as e:
-    logging.error(f"Error initializing Gemini models: {e}")
+    logging.error("Error initializing Gemini models: %s", e)
     raise
 
 
+# Content-addressed response cache: an exact sha256 match skips even the
+# image decode, and a 64-bit difference hash catches re-captures of the same
+# scene. Both map to the generated text, keyed per persona.
+_VISION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "orka")
+_VISION_CACHE_PATH = os.path.join(_VISION_CACHE_DIR, "vision_cache")
+
+
+def _dhash(img):
+    """64-bit difference hash: 9x8 grayscale, sign of adjacent-pixel deltas."""
+    from PIL import Image
+
+    gray = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+# Hot in-memory layer over the shelve store: a repeat within the same
+# process is served in microseconds without touching disk. Bounded LRU, so
+# worst-case memory is a few hundred short strings.
+_MEM_CACHE: OrderedDict = OrderedDict()
+_MEM_CACHE_MAX = 256
+_mem_cache_lock = threading.Lock()
+
+
+def _vision_cache_get(key):
+    with _mem_cache_lock:
+        value = _MEM_CACHE.get(key)
+        if value is not None:
+            _MEM_CACHE.move_to_end(key)
+            return value
+    try:
+        os.makedirs(_VISION_CACHE_DIR, exist_ok=True)
+        with shelve.open(_VISION_CACHE_PATH) as cache:
+            value = cache.get(key)
+    except Exception as e:
+        logging.debug("Vision cache read failed: %s", e)
+        return None
+    if value is not None:
+        with _mem_cache_lock:
+            _MEM_CACHE[key] = value
+            _MEM_CACHE.move_to_end(key)
+    return value
+
+
+def _vision_cache_put(*entries):
+    with _mem_cache_lock:
+        for key, value in entries:
+            _MEM_CACHE[key] = value
+            _MEM_CACHE.move_to_end(key)
+        while len(_MEM_CACHE) > _MEM_CACHE_MAX:
+            _MEM_CACHE.popitem(last=False)
+    try:
+        os.makedirs(_VISION_CACHE_DIR, exist_ok=True)
+        with shelve.open(_VISION_CACHE_PATH) as cache:
+            for key, value in entries:
+                cache[key] = value
+    except Exception as e:
+        logging.debug("Vision cache write failed: %s", e)
+
+
+# Images larger than this get downscaled before upload; roast-grade vision
+# doesn't benefit from more pixels and upload time drops proportionally.
+# The byte cap catches low-compression files (quality-100 JPEGs, PNG photos)
+# whose dimensions pass but whose upload cost doesn't.
+_MAX_UPLOAD_DIM = 1024
+_MAX_UPLOAD_BYTES = 1_500_000
+
+
+# Formats Gemini ingests directly; anything else is normalized to JPEG
+_GEMINI_NATIVE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def _image_part(image_path, image_bytes, img):
+    """Build a request part from raw bytes, downscaling oversized images.
+
+    Already-compressed native formats ship as-is without ever running the
+    pixel decode; only oversized or exotic formats (TIFF, BMP, ...) go
+    through a decode + RGB normalize + JPEG re-encode.
+    """
+    from PIL import Image
+    from google.genai import types
+
+    ext = os.path.splitext(image_path)[1].lower()
+    if (
+        ext in _GEMINI_NATIVE_EXTS
+        and max(img.size) <= _MAX_UPLOAD_DIM
+        and len(image_bytes) <= _MAX_UPLOAD_BYTES
+    ):
+        mime = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+        return types.Part.from_bytes(data=image_bytes, mime_type=mime)
+
+    if getattr(img, "format", None) == "JPEG":
+        # Subsampled libjpeg decode: the pixels are about to be thumbnailed
+        # anyway, so let the IDCT run at 1/2-1/8 scale (~4x faster, ~4x less
+        # memory on multi-megapixel camera output)
+        img.draft("RGB", (_MAX_UPLOAD_DIM, _MAX_UPLOAD_DIM))
+    scaled = img.convert("RGB")
+    scaled.thumbnail((_MAX_UPLOAD_DIM, _MAX_UPLOAD_DIM), Image.Resampling.LANCZOS)
+    buf = BytesIO()
+    scaled.save(buf, format="JPEG", quality=85, optimize=True)
+    return types.Part.from_bytes(data=buf.getvalue(), mime_type="image/jpeg")
+
+
 def get_response_from_image(image_path, persona):
     """
     Analyzes an image using Gemini Vision based on the provided persona.
 
     Args:
-        image_path (str): The path to the image file.
-        persona (dict): The persona dictionary defining behavior.
+        image_path (str | bytes): The path to the image file, or raw JPEG
+            bytes from an in-memory capture.
+        persona (Persona): The persona defining behavior.
 
     Returns:
         str: The generated text response, or an error message.
     """
+    in_memory = isinstance(image_path, (bytes, bytearray, memoryview))
     logging.info(
-        f"Generating image response for: {image_path} using persona: {persona['name']}"
+        "Generating image response for: %s using persona: %s",
+        "<in-memory capture>" if in_memory else image_path,
+        persona.name,
     )
     try:
-        img = Image.open(image_path)
-        # Use the persona's vision prompt template
-        prompt = persona.get("vision_prompt_template", "Describe this image.")
+        if in_memory:
+            image_bytes = bytes(image_path)
+            image_path = "capture.jpg"  # only the extension matters downstream
+            sha_key = f"sha:{persona.name}:{hashlib.sha256(image_bytes).hexdigest()}"
+            cached = _vision_cache_get(sha_key)
+            if cached is not None:
+                logging.info("Vision cache hit (exact bytes).")
+                return cached
+        else:
+            # mmap the file so hashing reads pages in place; the bytes are
+            # only materialized once the upload path actually needs an
+            # owning buffer
+            with open(image_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    sha_key = f"sha:{persona.name}:{hashlib.sha256(mm).hexdigest()}"
+                    cached = _vision_cache_get(sha_key)
+                    if cached is not None:
+                        # Exact-bytes hit: no copy, no decode
+                        logging.info("Vision cache hit (exact bytes).")
+                        return cached
+                    image_bytes = bytes(mm)
+
+        from PIL import Image
+
+        img = Image.open(BytesIO(image_bytes))
+
+        # Perceptual match covers re-captures of the same scene
+        ph_key = f"ph:{persona.name}:{_dhash(img)}"
+        cached = _vision_cache_get(ph_key)
+        if cached is not None:
+            logging.info("Vision cache hit (perceptual hash).")
+            _vision_cache_put((sha_key, cached))
+            return cached
 
-        # Use the API format for generation
-        response = client.models.generate_content(
-            model=vision_model_name, contents=[prompt, img]
+        # Use the persona's vision prompt template
+        prompt = persona.vision_prompt_template
+
+        # Use the API format for generation, shipping raw (possibly
+        # downscaled) bytes instead of a PIL image
+        response = _call_with_retry(
+            _get_client().models.generate_content,
+            model=vision_model_name,
+            contents=[prompt, _image_part(image_path, image_bytes, img)],
         )
 
-        # Handle potential blocks or empty responses
-        if hasattr(response, "candidates") and not response.candidates:
+        # Handle potential blocks or empty responses; getattr avoids the
+        # double attribute lookup (and hasattr's exception machinery)
+        candidates = getattr(response, "candidates", None)
+        if candidates is not None and not candidates:
             logging.warning("Gemini response has no candidates (possibly blocked).")
-            return f"I looked, but {persona['name']} is speechless. Couldn't generate a response."
+            return f"I looked, but {persona.name} is speechless. Couldn't generate a response."
 
         # Check if response has text
-        if not hasattr(response, "text") or not response.text:
+        text = getattr(response, "text", None)
+        if not text:
             logging.warning("Gemini response was blocked or empty.")
-            return f"My analysis using {persona['name']} was blocked or couldn't generate content."
+            return f"My analysis using {persona.name} was blocked or couldn't generate content."
 
-        response_text = response.text.strip()
-        logging.info(f"Generated image response: {response_text}")
+        response_text = text.strip()
+        logging.info("Generated image response: %s", response_text)
+        _vision_cache_put((sha_key, response_text), (ph_key, response_text))
         return response_text
 
     except FileNotFoundError:
-        logging.error(f"Image file not found at path: {image_path}")
+        logging.error("Image file not found at path: %s", image_path)
+        return "I can't process what I can't see! Image file not found."
+    except Exception as e:
+        logging.error("An error occurred during image processing: %s", e)
+        return f"Ouch! Something went wrong on my end processing that image ({type(e).__name__})."
+
+
+def get_response_from_image_stream(image_path, persona):
+    """
+    Streams the vision response incrementally.
+
+    Yields text fragments as they arrive, putting the first words in front
+    of the user within a few hundred ms instead of after the full
+    generation; total wall-clock is unchanged. Cache hits yield once, and
+    the assembled text is cached on completion.
+
+    Args:
+        image_path (str | bytes): The path to the image file, or raw JPEG bytes.
+        persona (Persona): The persona defining behavior.
+
+    Yields:
+        str: Response text fragments.
+    """
+    from PIL import Image
+
+    in_memory = isinstance(image_path, (bytes, bytearray, memoryview))
+    try:
+        if in_memory:
+            image_bytes = bytes(image_path)
+            image_path = "capture.jpg"
+        else:
+            with open(image_path, "rb") as f:
+                image_bytes = f.read()
+
+        sha_key = f"sha:{persona.name}:{hashlib.sha256(image_bytes).hexdigest()}"
+        cached = _vision_cache_get(sha_key)
+        if cached is not None:
+            logging.info("Vision cache hit (exact bytes).")
+            yield cached
+            return
+
+        img = Image.open(BytesIO(image_bytes))
+        prompt = persona.vision_prompt_template
+        parts = []
+        for chunk in _get_client().models.generate_content_stream(
+            model=vision_model_name,
+            contents=[prompt, _image_part(image_path, image_bytes, img)],
+        ):
+            chunk_text = getattr(chunk, "text", None)
+            if chunk_text:
+                parts.append(chunk_text)
+                yield chunk_text
+
+        response_text = "".join(parts).strip()
+        if response_text:
+            _vision_cache_put((sha_key, response_text))
+    except FileNotFoundError:
+        logging.error("Image file not found at path: %s", image_path)
+        yield "I can't process what I can't see! Image file not found."
+    except Exception as e:
+        logging.error("An error occurred during streamed image processing: %s", e)
+        yield f"Ouch! Something went wrong on my end processing that image ({type(e).__name__})."
+
+
+# Client-side priority tiers: interactive chat and background image jobs
+# draw from separate concurrency budgets, so a queue of captures can never
+# starve a user-facing reply. (The API offers no per-request priority knob;
+# partitioning the in-flight budget is the client-side equivalent.) The
+# work is I/O-bound waiting on the API, so concurrency up to the rate
+# limit is pure win, beyond it just 429s.
+_CHAT_SEMAPHORE = asyncio.Semaphore(8)
+_IMAGE_SEMAPHORE = asyncio.Semaphore(4)
+
+
+async def get_response_from_image_async(image_path, persona):
+    """
+    Async variant of get_response_from_image for concurrent callers.
+
+    File reading and decoding run in a thread, the API call goes through
+    client.aio, and a module-level semaphore bounds the number of in-flight
+    requests. The response cache is shared with the sync path.
+    """
+    logging.info(
+        "Generating async image response for: %s using persona: %s",
+        image_path, persona.name,
+    )
+
+    def _prepare():
+        from PIL import Image
+
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+        return image_bytes, Image.open(BytesIO(image_bytes))
+
+    try:
+        image_bytes, img = await asyncio.to_thread(_prepare)
+
+        sha_key = f"sha:{persona.name}:{hashlib.sha256(image_bytes).hexdigest()}"
+        cached = await asyncio.to_thread(_vision_cache_get, sha_key)
+        if cached is not None:
+            logging.info("Vision cache hit (exact bytes).")
+            return cached
+
+        prompt = persona.vision_prompt_template
+        async with _IMAGE_SEMAPHORE:
+            response = await _get_client().aio.models.generate_content(
+                model=vision_model_name,
+                contents=[prompt, _image_part(image_path, image_bytes, img)],
+            )
+
+        text = getattr(response, "text", None)
+        if not text:
+            logging.warning("Gemini response was blocked or empty.")
+            return f"My analysis using {persona.name} was blocked or couldn't generate content."
+
+        response_text = text.strip()
+        await asyncio.to_thread(_vision_cache_put, (sha_key, response_text))
+        return response_text
+    except FileNotFoundError:
+        logging.error("Image file not found at path: %s", image_path)
         return "I can't process what I can't see! Image file not found."
     except Exception as e:
-        logging.error(f"An error occurred during image processing: {e}")
+        logging.error("An error occurred during image processing: %s", e)
         return f"Ouch! Something went wrong on my end processing that image ({type(e).__name__})."
 
 
+async def get_chat_reply_async(chat_session, user_input):
+    """
+    Async variant of get_chat_reply. Chat sessions are synchronous objects,
+    so the call runs on a thread under the shared semaphore — concurrent
+    users wait max(latency) instead of sum(latency).
+    """
+    async with _CHAT_SEMAPHORE:
+        return await asyncio.to_thread(get_chat_reply, chat_session, user_input)
+
+
+def get_responses_from_images(image_paths, persona):
+    """
+    Analyzes several images with a single Gemini request.
+
+    Bulk workloads are bottlenecked on the network round-trip and prefill,
+    not per-image decode, so one multi-image call with a structured JSON
+    answer amortizes both. Interactive single-image use should keep calling
+    get_response_from_image.
+
+    Args:
+        image_paths (list): Paths to the image files.
+        persona (Persona): The persona defining behavior.
+
+    Returns:
+        list: One response string (or error message) per input path, in order.
+    """
+    logging.info(
+        "Generating batched image responses for %s images using persona: %s",
+        len(image_paths), persona.name,
+    )
+    from PIL import Image
+    from google.genai import types
+
+    results = [None] * len(image_paths)
+    parts = []
+    part_indices = []
+    for idx, image_path in enumerate(image_paths):
+        try:
+            with open(image_path, "rb") as f:
+                image_bytes = f.read()
+            img = Image.open(BytesIO(image_bytes))
+            parts.append(_image_part(image_path, image_bytes, img))
+            part_indices.append(idx)
+        except Exception as e:
+            logging.error("Could not load image %s: %s", image_path, e)
+            results[idx] = "I can't process what I can't see! Image file not found."
+
+    if not parts:
+        return results
+
+    prompt = (
+        f"{persona.vision_prompt_template}\n\n"
+        f"You are given {len(parts)} images. Respond to each image "
+        "independently in the same style. Output JSON: a list of objects "
+        '{"idx": <0-based image index>, "response": <your text>}.'
+    )
+    try:
+        response = _call_with_retry(
+            _get_client().models.generate_content,
+            model=vision_model_name,
+            contents=[prompt, *parts],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json"
+            ),
+        )
+        for entry in json.loads(response.text):
+            batch_idx = entry.get("idx")
+            if batch_idx is not None and 0 <= batch_idx < len(part_indices):
+                results[part_indices[batch_idx]] = entry.get("response", "")
+    except Exception as e:
+        logging.error("Batched image request failed: %s", e)
+
+    fallback = f"My analysis using {persona.name} was blocked or couldn't generate content."
+    return [fallback if r is None else r for r in results]
+
+
 def start_chat_session(persona):
     """
     Starts a new chat session with the text model using the specified persona.
 
     Args:
-        persona (dict): The persona dictionary containing system_instruction.
+        persona (Persona): The persona providing the system_instruction.
 
     Returns:
         object: Chat session object.
     """
-    logging.info(f"Starting new chat session with persona: {persona['name']}")
+    logging.info("Starting new chat session with persona: %s", persona.name)
     try:
         # Get the system instruction from the persona
-        system_instruction = persona.get(
-            "system_instruction", "You are a helpful assistant."
-        )
+        system_instruction = persona.system_instruction
+
+        from google.genai import types
 
         # Use the API format for chat creation
-        chat = client.chats.create(
+        chat = _get_client().chats.create(
             model=text_model_name,
             config=types.GenerateContentConfig(system_instruction=system_instruction),
         )
@@ -97,36 +566,139 @@ def start_chat_session(persona):
         return chat
 
     except Exception as e:
-        logging.error(f"Error creating chat session: {e}")
+        logging.error("Error creating chat session: %s", e)
         raise
 
 
-def get_chat_reply(chat_session, user_input):
+# Module-level chat session for callers that don't manage their own: keeps
+# one warm session per process instead of re-sending the system instruction
+# with a fresh session every turn
+_default_chat = None
+
+
+def get_default_chat():
+    """Returns the shared chat session, creating it from the active persona."""
+    global _default_chat
+    if _default_chat is None:
+        from src.persona import ACTIVE_PERSONA
+
+        _default_chat = start_chat_session(ACTIVE_PERSONA)
+    return _default_chat
+
+
+def reset_chat():
+    """Drops the shared chat session; the next reply starts a fresh one."""
+    global _default_chat
+    _default_chat = None
+
+
+# Cap on retained history entries (20 user/model turn pairs). Every send
+# re-uploads the whole history, so an unbounded session grows linearly in
+# tokens, bytes and prefill time.
+_MAX_HISTORY_ENTRIES = 40
+
+
+def _trim_chat_history(chat_session):
+    """Bounds the session history so per-turn prompt size stays constant.
+
+    Reaches into the SDK's history lists (there is no public truncation
+    API); guarded so an SDK change degrades to unbounded history rather
+    than a crash.
+    """
+    try:
+        for attr in ("_curated_history", "_comprehensive_history"):
+            history = getattr(chat_session, attr, None)
+            if isinstance(history, list) and len(history) > _MAX_HISTORY_ENTRIES:
+                del history[: len(history) - _MAX_HISTORY_ENTRIES]
+    except Exception as e:
+        logging.debug("Could not trim chat history: %s", e)
+
+
+# Sentence boundary for pipelining streamed replies into TTS
+_SENTENCE_END = re.compile(r"[.?!]\s|\n")
+
+
+def _deliver(text, on_sentence):
+    """Hand a complete reply to the sentence callback (non-streaming paths)."""
+    if on_sentence is not None:
+        on_sentence(text)
+    return text
+
+
+def get_chat_reply(chat_session, user_input, on_sentence=None):
     """
     Gets a conversational reply from the Gemini text model within a chat session.
 
+    Streams the response when the session supports it, so each completed
+    sentence can be handed to `on_sentence` (e.g. the TTS queue) while the
+    rest is still generating.
+
     Args:
         chat_session: An active chat session object from `start_chat_session()`.
         user_input (str): The text input from the user.
+        on_sentence (callable, optional): Called with each completed sentence
+            as it arrives; falls back to one call with the full reply.
 
     Returns:
         str: The generated reply text, or an error message.
     """
-    logging.info(f"Sending user input to chat: '{user_input}'")
+    logging.info("Sending user input to chat: '%s'", user_input)
     try:
-        response = chat_session.send_message(user_input)
+        stream_fn = getattr(chat_session, "send_message_stream", None)
+        if stream_fn is not None:
+            parts = []
+            buffer = ""
+            for chunk in stream_fn(user_input):
+                chunk_text = getattr(chunk, "text", None)
+                if not chunk_text:
+                    continue
+                parts.append(chunk_text)
+                if on_sentence is not None:
+                    buffer += chunk_text
+                    while True:
+                        match = _SENTENCE_END.search(buffer)
+                        if match is None:
+                            break
+                        sentence = buffer[: match.end()].strip()
+                        buffer = buffer[match.end():]
+                        if sentence:
+                            on_sentence(sentence)
+
+            reply = "".join(parts).strip()
+            if not reply:
+                logging.warning("Gemini chat response was blocked or empty.")
+                return _deliver(
+                    "I'm not sure how to respond to that. Let's try something else.",
+                    on_sentence,
+                )
+            if on_sentence is not None and buffer.strip():
+                on_sentence(buffer.strip())
+            logging.info("Generated reply: %s", reply)
+            _trim_chat_history(chat_session)
+            return reply
+
+        # Session without streaming support: single-shot request
+        response = _call_with_retry(chat_session.send_message, user_input)
 
         # Check if response has text
-        if not hasattr(response, "text") or not response.text:
+        text = getattr(response, "text", None)
+        if not text:
             logging.warning("Gemini chat response was blocked or empty.")
-            return "I'm not sure how to respond to that. Let's try something else."
-
-        reply = response.text.strip()
-        logging.info(f"Generated reply: {reply}")
-        return reply
+            return _deliver(
+                "I'm not sure how to respond to that. Let's try something else.",
+                on_sentence,
+            )
+
+        reply = text.strip()
+        logging.info("Generated reply: %s", reply)
+        _trim_chat_history(chat_session)
+        return _deliver(reply, on_sentence)
     except Exception as e:
-        logging.error(f"An error occurred during text reply generation: {e}")
-        return f"Sorry, I encountered an error ({type(e).__name__}). Can we try again?"
+        logging.error("An error occurred during text reply generation: %s", e)
+        return _deliver(
+            f"Sorry, I encountered an error ({type(e).__name__}). Can we try again?",
+            on_sentence,
+        )
 
 
 def get_chat_history(chat_session):
@@ -145,7 +717,7 @@ def get_chat_history(chat_session):
         logging.warning("Chat session doesn't have a history attribute.")
         return []
     except Exception as e:
-        logging.error(f"Error retrieving chat history: {e}")
+        logging.error("Error retrieving chat history: %s", e)
         return []
 
 
@@ -162,11 +734,18 @@ def get_roast_from_image(image_path):
     return get_response_from_image(image_path, ROASTYY)
 
 
-def get_reply_from_text(chat_session, user_input):
+def get_reply_from_text(chat_session, user_input=None):
     """
     Legacy function - use get_chat_reply instead.
+
+    The session argument is optional now: passing only the text reuses the
+    shared module-level session from get_default_chat().
     """
     logging.warning(
         "Using deprecated get_reply_from_text function. Use get_chat_reply instead."
     )
+    if user_input is None:
+        chat_session, user_input = None, chat_session
+    if chat_session is None:
+        chat_session = get_default_chat()
     return get_chat_reply(chat_session, user_input)
@@ -1,7 +1,8 @@
+import atexit
 import logging
 import os
 import subprocess
-import config  
+import config
 
 # Uncomment the one you need for RPi
 # import cv2 # For OpenCV with USB Webcam
@@ -9,33 +10,69 @@ import config
 # import time # Usually needed with camera libraries
 
 
+# Fork/exec plus the ART/dex classloader warm-up of the Termux:API tools
+# costs 200-500 ms; a one-time `termux-camera-info` run leaves the camera
+# service and libtermux-api resident for the real captures.
+_termux_camera_warmed = False
+
+
+def _warm_termux_camera():
+    global _termux_camera_warmed
+    if _termux_camera_warmed:
+        return
+    _termux_camera_warmed = True
+    try:
+        subprocess.run(
+            ["termux-camera-info"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=10,
+            check=False,
+        )
+        logging.debug("Termux camera warm-up complete.")
+    except Exception as e:
+        logging.debug("Termux camera warm-up skipped: %s", e)
+
+
 def _capture_image_termux(output_path=config.TEMP_IMAGE_PATH):
     """Captures an image using Termux:API."""
     logging.info("Attempting image capture via Termux:API...")
     try:
+        _warm_termux_camera()
         # Command to take a photo with the back camera (usually '0')
         # You might need to experiment with camera IDs (e.g., '1' for front)
+        # stdout is discarded: the tool prints nothing useful and piping it
+        # just adds I/O
         command = ["termux-camera-photo", "-c", "0", output_path]
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        logging.info(f"Termux camera command output: {result.stdout}")
-        if os.path.exists(output_path):
-            logging.info(f"Image saved successfully to {output_path}")
-            return output_path
-        else:
+        subprocess.run(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        try:
+            # One stat doubles as existence and truncation check; the old
+            # exists() probe cost a second syscall and left a TOCTOU window
+            # before the consumer opened the file
+            if os.stat(output_path).st_size > 0:
+                logging.info("Image saved successfully to %s", output_path)
+                return output_path
+            logging.error("Termux camera produced an empty image file.")
+        except FileNotFoundError:
             logging.error("Termux command ran but image file was not created.")
-            return None
+        return None
     except FileNotFoundError:
         logging.error(
             "`termux-camera-photo` command not found. Is Termux:API installed and configured?"
         )
         return None
     except subprocess.CalledProcessError as e:
-        logging.error(f"Termux camera command failed with error code {e.returncode}:")
-        logging.error(f"Stderr: {e.stderr}")
-        logging.error(f"Stdout: {e.stdout}")
+        logging.error("Termux camera command failed with error code %s:", e.returncode)
+        logging.error("Stderr: %s", e.stderr)
         return None
     except Exception as e:
-        logging.error(f"An unexpected error occurred during Termux image capture: {e}")
+        logging.error("An unexpected error occurred during Termux image capture: %s", e)
         return None
 
 
@@ -112,6 +149,41 @@ def _capture_image_rpi(output_path=config.TEMP_IMAGE_PATH):
     return None
 
 
+# Keep the webcam open across captures: V4L2 negotiation plus the lighting
+# settle delay cost ~2s per open, paid only on the first capture this way.
+_linux_cap = None
+
+
+def _get_linux_capture():
+    global _linux_cap
+    import cv2
+
+    if _linux_cap is not None and _linux_cap.isOpened():
+        return _linux_cap
+
+    # Use 0 for the default camera
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        return None
+
+    # Give camera time to initialize and adjust to lighting
+    import time
+
+    time.sleep(2)
+    _linux_cap = cap
+    return cap
+
+
+def _release_linux_capture():
+    global _linux_cap
+    if _linux_cap is not None:
+        _linux_cap.release()
+        _linux_cap = None
+
+
+atexit.register(_release_linux_capture)
+
+
 def _capture_image_linux(output_path=config.TEMP_IMAGE_PATH):
     """Captures an image using webcam on Linux."""
     logging.info("Attempting image capture via webcam on Linux...")
@@ -119,45 +191,89 @@ def _capture_image_linux(output_path=config.TEMP_IMAGE_PATH):
     try:
         import cv2
 
-        # Use 0 for the default camera
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        cap = _get_linux_capture()
+        if cap is None:
             logging.error("Cannot open camera via OpenCV.")
             return None
 
-        # Give camera time to initialize and adjust to lighting
-        import time
-
-        time.sleep(2)
-
-        # Capture frame
+        # Drain stale driver buffers so the saved frame is current, then
+        # capture
+        for _ in range(2):
+            cap.read()
         ret, frame = cap.read()
         if not ret:
             logging.error("Can't receive frame from camera. Exiting.")
-            cap.release()
+            _release_linux_capture()  # force a fresh open next time
             return None
 
         # Save the image
         cv2.imwrite(output_path, frame)
-        cap.release()
-        logging.info(f"Image saved successfully via OpenCV to {output_path}")
+        logging.info("Image saved successfully via OpenCV to %s", output_path)
         return output_path
 
     except ImportError:
         logging.warning("OpenCV (cv2) library not found. Cannot use webcam.")
         return None
     except Exception as e:
-        logging.error(f"Failed to capture image with OpenCV: {e}")
+        logging.error("Failed to capture image with OpenCV: %s", e)
+        return None
+
+
+def capture_jpeg_linux(quality=85):
+    """
+    Captures a frame and JPEG-encodes it in memory on Linux.
+
+    Skips the disk round-trip (write then re-read) entirely; the bytes can
+    go straight to the vision API.
+
+    Returns:
+        bytes: JPEG data, or None if capture failed.
+    """
+    try:
+        import cv2
+
+        cap = _get_linux_capture()
+        if cap is None:
+            logging.error("Cannot open camera via OpenCV.")
+            return None
+        for _ in range(2):
+            cap.read()
+        ret, frame = cap.read()
+        if not ret:
+            logging.error("Can't receive frame from camera.")
+            _release_linux_capture()
+            return None
+        ok, jpg = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if not ok:
+            logging.error("Failed to JPEG-encode captured frame.")
+            return None
+        return jpg.tobytes()
+    except ImportError:
+        logging.warning("OpenCV (cv2) library not found. Cannot use webcam.")
+        return None
+    except Exception as e:
+        logging.error("Failed to capture in-memory image with OpenCV: %s", e)
         return None
 
 
-def get_image():
+def get_image(as_bytes=False):
     """
     Gets an image, either by capturing it based on platform or asking for a path.
 
+    Args:
+        as_bytes (bool): When True on platforms that support it, return the
+            JPEG bytes directly instead of writing a file to disk.
+
     Returns:
-        str: Path to the captured/selected image, or None if failed.
+        str | bytes: Path to (or bytes of) the captured/selected image, or
+        None if failed.
     """
+    if as_bytes and config.PLATFORM == "linux":
+        data = capture_jpeg_linux()
+        if data is not None:
+            return data
+        logging.info("In-memory capture failed; falling back to file capture.")
+
     image_path = None
     if config.PLATFORM == "termux":
         image_path = _capture_image_termux()
@@ -177,20 +293,20 @@ def get_image():
                 "Please enter the path to an image file (or press Enter to cancel): "
             ).strip()
             if user_path and os.path.exists(user_path):
-                logging.info(f"Using user-provided image path: {user_path}")
+                logging.info("Using user-provided image path: %s", user_path)
                 # You might want to copy this to a standard temp path
                 # For simplicity, we'll use the provided path directly here
                 # but be mindful of permissions and cleanup if necessary.
                 return user_path
             elif user_path:
                 print(f"Error: File not found at '{user_path}'")
-                logging.warning(f"User provided non-existent path: {user_path}")
+                logging.warning("User provided non-existent path: %s", user_path)
                 return None
             else:
                 logging.info("User cancelled providing image path.")
                 return None
         except Exception as e:
-            logging.error(f"Error getting image path from user: {e}")
+            logging.error("Error getting image path from user: %s", e)
             return None
 
     return image_path  # Return path from capture or None
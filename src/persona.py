@@ -1,23 +1,36 @@
 """
 Defines different personas for the AI agent.
-Each persona is a dictionary containing:
+Each persona is an immutable Persona tuple containing:
 - name: The name the agent will use.
 - system_instruction: The core instruction given to the text model for chat.
 - vision_prompt_template: A template for the prompt given to the vision model.
                           Use {details} as a placeholder for specific instructions if needed,
                           though often the system instruction covers the general tone.
+
+Immutable tuples make field access an attribute load instead of a dict
+lookup and are safe to share across threads.
 """
-import logging 
-import config 
+import logging
+from typing import NamedTuple
+
+import config
+
 
-ROASTYY = {
-    "name": "Roastyy",
-    "system_instruction": (
+class Persona(NamedTuple):
+    name: str
+    # Defaults keep ad-hoc personas working without every field spelled out
+    system_instruction: str = "You are a helpful assistant."
+    vision_prompt_template: str = "Describe this image."
+
+
+ROASTYY = Persona(
+    name="Roastyy",
+    system_instruction=(
         "You are Roastyy, a witty and sarcastic AI assistant specializing in light-hearted roasts. "
         "Engage in conversation, be funny, slightly sarcastic, but always SFW (safe-for-work). "
         "Respond to user input with witty remarks or follow-up roasts. Keep responses relatively concise.Do not use markdown, only plain text."
     ),
-    "vision_prompt_template": (
+    vision_prompt_template=(
         "You are Roastyy, a witty and sarcastic AI assistant. "
         "Your task is to analyze the provided image and deliver a short, funny, "
         "and SFW (safe-for-work) roast based on its content. "
@@ -25,37 +38,37 @@ ROASTYY = {
         "Focus on observable details in the image for your roast."
         "\n\nRoast this image:"
     ),
-}
+)
 
-HELPER = {
-    "name": "HelperBot",
-    "system_instruction": (
+HELPER = Persona(
+    name="HelperBot",
+    system_instruction=(
         "You are HelperBot, a friendly and informative AI assistant. "
         "Your goal is to be helpful, clear, and concise in your responses. "
         "Provide accurate information and answer questions directly.Keep responses relatively concise.Do not use markdown, only plain text."
     ),
-    "vision_prompt_template": (
+    vision_prompt_template=(
         "You are HelperBot, a friendly and informative AI assistant. "
         "Analyze the provided image and describe its main contents objectively and concisely. "
         "Focus on identifying key objects, scenes, or actions."
         "\n\nDescribe this image:"
     ),
-}
+)
 
-ANALYTICS = {
-    "name": "AnalyticsBot",
-    "system_instruction": (
+ANALYTICS = Persona(
+    name="AnalyticsBot",
+    system_instruction=(
         "You are AnalyticsBot, an AI assistant focused on data analysis and insights. "
         "Your goal is to provide clear and actionable insights based on the data provided. "
         "Be analytical and detail-oriented in your responses."
     ),
-    "vision_prompt_template": (
+    vision_prompt_template=(
         "You are AnalyticsBot, an AI assistant focused on data analysis. "
         "Analyze the provided image for any charts, graphs, or data visualizations. "
         "Describe the key insights and trends observed in the image."
         "\n\nAnalyze this image:"
     ),
-}
+)
 
 
 
@@ -68,7 +81,58 @@ AVAILABLE_PERSONAS = {
     "ROASTYY": ROASTYY,
     "HELPER": HELPER,
     "ANALYTICS": ANALYTICS,
-    
+
+}
+
+
+def make_vision_responder(persona):
+    """Builds a specialized vision function for one persona.
+
+    Partial evaluation: the prompt and model name are captured as closure
+    locals, so each call skips the per-call persona attribute lookups and
+    goes straight to building the request. The returned function accepts an
+    image path, raw JPEG bytes, or a PIL image.
+    """
+    from src import gemini_handler
+
+    prompt = persona.vision_prompt_template
+    model = gemini_handler.vision_model_name
+
+    def respond(image_or_path):
+        from io import BytesIO
+
+        from PIL import Image
+
+        if isinstance(image_or_path, (bytes, bytearray, memoryview)):
+            data = bytes(image_or_path)
+            path = "capture.jpg"
+            img = Image.open(BytesIO(data))
+        elif isinstance(image_or_path, str):
+            path = image_or_path
+            with open(path, "rb") as f:
+                data = f.read()
+            img = Image.open(BytesIO(data))
+        else:  # assume a PIL image
+            img = image_or_path
+            buf = BytesIO()
+            img.save(buf, format="JPEG", quality=85)
+            data = buf.getvalue()
+            path = "capture.jpg"
+
+        response = gemini_handler._call_with_retry(
+            gemini_handler._get_client().models.generate_content,
+            model=model,
+            contents=[prompt, gemini_handler._image_part(path, data, img)],
+        )
+        text = getattr(response, "text", None)
+        return text.strip() if text else None
+
+    return respond
+
+
+# Pre-built responders, one per persona
+VISION_RESPONDERS = {
+    key: make_vision_responder(p) for key, p in AVAILABLE_PERSONAS.items()
 }
 
 # Default persona if not specified otherwise or if name is invalid
@@ -81,9 +145,10 @@ try:
     ACTIVE_PERSONA = AVAILABLE_PERSONAS.get(active_persona_name, DEFAULT_PERSONA)
     if active_persona_name not in AVAILABLE_PERSONAS:
         logging.warning(
-            f"Persona '{active_persona_name}' from config not found in AVAILABLE_PERSONAS. Using default '{DEFAULT_PERSONA['name']}'."
+            "Persona '%s' from config not found in AVAILABLE_PERSONAS. Using default '%s'.",
+            active_persona_name, DEFAULT_PERSONA.name,
         )
-    logging.info(f"Successfully loaded active persona: {ACTIVE_PERSONA['name']}")
+    logging.info("Successfully loaded active persona: %s", ACTIVE_PERSONA.name)
 except Exception as e:
-    logging.exception(f"Error loading active persona: {e}. Using default.")
+    logging.exception("Error loading active persona: %s. Using default.", e)
     ACTIVE_PERSONA = DEFAULT_PERSONA
@@ -12,5 +12,10 @@ def setup_logging():
     # logging.getLogger("PIL").setLevel(logging.WARNING)
     # logging.getLogger("urllib3").setLevel(logging.WARNING)
 
+    # Skip the per-record thread/process field lookups nothing formats
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
 
 # You can add other utility functions here if needed.